@@ -1,59 +1,186 @@
 import os
+import queue
+import time
 
-from flask_restful import Api
-from flasgger import Swagger, swag_from
-from flask import Flask, render_template, redirect, url_for, request, jsonify, abort
-from dict2xml import dict2xml
+from flask import Flask, render_template, redirect, url_for, request, jsonify, abort, stream_with_context, g
 from dotenv import load_dotenv
 from peewee import PeeweeException, DatabaseError
 
-from race_report import abbr_decoder, drivers_best_lap, build_report
-from db_utils import add_drivers_to_db
-from models import DriverModel
+from race_report import parse_race
+from db_utils import add_drivers_to_db, add_race_to_db, check_input_files, store_input_files, DEFAULT_SESSION
+from models import db, DriverModel, RaceModel, SessionModel, ResultModel
 from logger.logger import create_report_logger
+from cache import cached_response, conditional_response, precompressed_page
+from events import standings_events
+from snapshot import report_snapshot, query_snapshot
+from docs import LazySwaggerMiddleware
+from metrics import (timed_stage, render_metrics, count_queries, start_request_queries, request_query_count,
+                     request_latency, request_queries, start_profile, save_profile)
 
 
 app = Flask(__name__)
-api = Api(app)
 load_dotenv()
-swagger = Swagger(app, template_file=os.getenv("SWAG_REPORT_PATH"))
+app.wsgi_app = LazySwaggerMiddleware(app.wsgi_app, template_file=os.getenv("SWAG_REPORT_PATH"))
 logger = create_report_logger()
 
+STREAM_KEEPALIVE = float(os.getenv("STREAM_KEEPALIVE", 15))
+REPORT_FIELDS = ("name", "place", "team", "best_lap", "abbr")
+DRIVERS_FIELDS = ("name", "team")
 
-def format_response(parser: str, data: dict):
+
+@timed_stage("format_response")
+def format_response(parser: str, data: dict, **xml_tags):
     """Format the response based on the parser type.
 
     Args:
         parser (str): The parser type ("json" or "xml").
         data (dict): The data to be formatted.
+        xml_tags: The `root` element of a list and the `tag` of an item, passed to
+                  `xml_writer.to_xml`.
     """
     if parser.lower() == "json":
         return jsonify(data), 200
     elif parser.lower() == "xml":
-        return dict2xml(data), 200
+        from xml_writer import to_xml
+
+        return app.response_class(to_xml(data, **xml_tags), mimetype="application/xml"), 200
+    else:
+        logger.error(f"Invalid parser type {parser}")
+        abort(400, f"Invalid parser type {parser}. Supported types: JSON, XML")
+
+
+def stream_response(parser: str, rows):
+    """Stream rows as a chunked JSON array or XML document.
+
+    Rows are serialized one at a time while `rows` is iterated, so the memory used
+    does not grow with the number of drivers.
+
+    Args:
+        parser (str): The parser type ("json" or "xml").
+        rows: An iterable of dicts, e.g. a peewee `.dicts().iterator()`.
+    """
+    if parser.lower() == "json":
+        def generate():
+            separator = ""
+            yield "["
+            for row in rows:
+                yield separator + app.json.dumps(row)
+                separator = ","
+            yield "]\n"
+        return app.response_class(stream_with_context(generate()), mimetype="application/json")
+    elif parser.lower() == "xml":
+        from xml_writer import iter_xml
+
+        return app.response_class(stream_with_context(iter_xml(rows)), mimetype="application/xml")
     else:
         logger.error(f"Invalid parser type {parser}")
         abort(400, f"Invalid parser type {parser}. Supported types: JSON, XML")
 
 
-def get_drivers_query(query, order_by, desc: bool = False):
-    """Get a sorted query of drivers. """
-    if desc:
-        return query.order_by(order_by.desc())
-    return query.order_by(order_by)
+def get_int_arg(name: str):
+    """Get a non-negative integer query argument, or None if it is missing."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    if not (value.isascii() and value.isdigit()):
+        logger.error(f"Invalid {name} value {value}")
+        abort(400, f"Invalid {name} value {value}. Expected a non-negative integer")
+    return int(value)
+
+
+def is_stream_requested() -> bool:
+    """Check the `stream` query argument that switches to a chunked response."""
+    return request.args.get("stream", "").lower() in ("1", "true")
+
+
+def get_field_names_arg(default_fields: tuple) -> tuple:
+    """Get the field names selected with the comma-separated `fields` query argument."""
+    fields = request.args.get("fields")
+    names = tuple(name.strip() for name in fields.split(",")) if fields else default_fields
+    invalid_names = [name for name in names if name not in REPORT_FIELDS]
+    if invalid_names:
+        logger.error(f"Invalid fields {invalid_names}")
+        abort(400, f"Invalid fields {', '.join(invalid_names)}. Supported fields: {', '.join(REPORT_FIELDS)}")
+    return names
+
+
+def get_fields_arg(default_fields: tuple, model=DriverModel) -> list:
+    """Get the model fields selected with the comma-separated `fields` query argument."""
+    return [getattr(model, name) for name in get_field_names_arg(default_fields)]
+
+
+def filter_snapshot(rows: tuple, fields: tuple, after_place: int = None) -> list:
+    """Apply the `team` filter and the `limit`/`offset` pagination query arguments to snapshot rows."""
+    return query_snapshot(rows, fields, request.args.get("team"), after_place,
+                          get_int_arg("limit"), get_int_arg("offset"))
+
+
+def filter_drivers_query(query, model=DriverModel):
+    """Apply the `team` filter and the `limit`/`offset` pagination query arguments."""
+    team = request.args.get("team")
+    if team:
+        query = query.where(model.team == team)
+    limit = get_int_arg("limit")
+    offset = get_int_arg("offset")
+    if limit is not None or offset is not None:
+        query = query.limit(limit).offset(offset)
+    return query
 
 
 def initialize_app():
     abbreviations_path = os.getenv("ABBREVIATIONS_PATH")
     startlog_path = os.getenv("STARTLOG_PATH")
     endlog_path = os.getenv("ENDLOG_PATH")
-    
-    drivers_info = abbr_decoder(abbreviations_path)
-    drivers_lap = drivers_best_lap(startlog_path, endlog_path)
-    report = build_report(drivers_info, drivers_lap)
+    race_season = os.getenv("RACE_SEASON")
+
+    fingerprints, unchanged = check_input_files([abbreviations_path, startlog_path, endlog_path])
+    if unchanged:
+        store_input_files(fingerprints)
+        logger.info("Input files are unchanged since the last load, skipping parsing")
+        return
+
+    report = parse_race(abbreviations_path, startlog_path, endlog_path)
     add_drivers_to_db(report)
+    add_race_to_db(report,
+                   race_name=os.getenv("RACE_NAME", "Monaco Grand Prix"),
+                   session_name=os.getenv("RACE_SESSION", "Race"),
+                   season=int(race_season) if race_season else None)
+    store_input_files(fingerprints)
     
 
+count_queries(db)
+
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.profiler = start_profile()
+    start_request_queries()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record the latency and database queries of a request, by route rule."""
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    request_latency.observe(time.perf_counter() - g.request_started, request.method, route, response.status_code)
+    request_queries.observe(request_query_count(), request.method, route)
+    if g.profiler is not None:
+        save_profile(g.profiler, request.endpoint or "unmatched")
+    return response
+
+
+@app.teardown_request
+def close_db_connection(error):
+    """Close the connection a request opened, or return it to the pool.
+
+    Connections are opened lazily by the first query, so requests served from the
+    snapshot or the response cache never touch the database. A streamed response
+    keeps its connection until the last chunk is sent.
+    """
+    if not db.is_closed():
+        db.close()
+
+
 @app.errorhandler(ValueError)
 @app.errorhandler(404)
 def page_not_found(error):
@@ -73,24 +200,27 @@ def index():
 
 
 @app.route("/report/")
+@precompressed_page
 def report():
     desc_order = request.args.get("order") == "desc"
-    query = DriverModel.select()
-    sorted_query = get_drivers_query(query, DriverModel.place, desc_order)
-    return render_template("report.html", drivers_info=sorted_query)
+    snapshot = report_snapshot.get()
+    drivers_info = snapshot.by_place_desc if desc_order else snapshot.by_place
+    return render_template("report.html", drivers_info=drivers_info)
 
 
 @app.route("/report/drivers/")
+@precompressed_page
 def report_drivers():
     desc_order = request.args.get("order") == "desc"
-    query = DriverModel.select()
-    sorted_query = get_drivers_query(query, DriverModel.name, desc_order)
-    return render_template("report_drivers.html", drivers_info=sorted_query)
+    snapshot = report_snapshot.get()
+    drivers_info = snapshot.by_name_desc if desc_order else snapshot.by_name
+    return render_template("report_drivers.html", drivers_info=drivers_info)
 
 
 @app.route("/report/drivers/<driver_id>")
+@conditional_response
 def report_driver(driver_id):
-    driver = DriverModel.select().where(DriverModel.abbr == driver_id).first()
+    driver = report_snapshot.get().by_abbr.get(driver_id)
     if not driver:
         logger.error(f"Driver '{driver_id}' not found")
         raise ValueError
@@ -98,40 +228,124 @@ def report_driver(driver_id):
 
 
 @app.route("/api/v1/report/", methods=["GET"])
-@swag_from("swag_forms/report.yml")
+@conditional_response
+@cached_response
 def report_api():
     """Generate a report in JSON or XML format. """
     parser = request.args.get("format")
-    query = DriverModel.select()
-    json_data = [driver.serialize_report() for driver in query]
+    fields = get_field_names_arg(REPORT_FIELDS)
+    json_data = filter_snapshot(report_snapshot.get().by_place, fields, get_int_arg("after_place"))
+    if is_stream_requested():
+        return stream_response(parser=parser, rows=iter(json_data))
     response = format_response(parser=parser, data=json_data)
     return response
 
 
 @app.route("/api/v1/report/drivers/", methods=["GET"])
-@swag_from("swag_forms/report.yml")
+@conditional_response
+@cached_response
 def report_drivers_api():
     """Retrieve information about drivers in JSON or XML format."""
     parser = request.args.get("format")
-    query = DriverModel.select().order_by(DriverModel.name)
-    json_data = [driver.serialize_drivers() for driver in query]
+    fields = get_field_names_arg(DRIVERS_FIELDS)
+    json_data = filter_snapshot(report_snapshot.get().by_name, fields)
+    if is_stream_requested():
+        return stream_response(parser=parser, rows=iter(json_data))
     response = format_response(parser=parser, data=json_data)
     return response
 
 
 @app.route("/api/v1/report/drivers/<driver_abbr>", methods=["GET"])
+@conditional_response
+@cached_response
 def report_driver_api(driver_abbr):
     """Retrieve information about driver in JSON or XML format."""
     parser = request.args.get("format")
-    driver_info = DriverModel.select().where(DriverModel.abbr == driver_abbr).first()
+    driver_info = report_snapshot.get().by_abbr.get(driver_abbr)
     if not driver_info:
         logger.error(f"Driver '{driver_abbr}' not found")
         raise ValueError
-    json_data = DriverModel.serialize_drivers(driver_info)
+    json_data = {field: driver_info[field] for field in DRIVERS_FIELDS}
+    response = format_response(parser=parser, data=json_data)
+    return response
+
+
+@app.route("/metrics")
+def metrics():
+    """Expose the request, stage and database metrics in the Prometheus text format."""
+    return app.response_class(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/v1/report/stream", methods=["GET"])
+def report_stream_api():
+    """Push changed standings rows to the client as Server-Sent Events."""
+    subscription = standings_events.subscribe()
+
+    def generate():
+        try:
+            yield ": connected\n\n"
+            while not subscription.overflowed:
+                try:
+                    rows = subscription.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: standings\ndata: {app.json.dumps(rows)}\n\n"
+            yield "event: reload\ndata: {}\n\n"
+        finally:
+            standings_events.unsubscribe(subscription)
+
+    return app.response_class(stream_with_context(generate()), mimetype="text/event-stream",
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/api/v1/races/", methods=["GET"])
+@conditional_response
+@cached_response
+def races_api():
+    """Retrieve the stored race sessions in JSON or XML format."""
+    parser = request.args.get("format")
+    query = (SessionModel
+             .select(RaceModel.id, RaceModel.name, RaceModel.season, SessionModel.name.alias("session"))
+             .join(RaceModel)
+             .order_by(RaceModel.season, RaceModel.name, SessionModel.id))
+    json_data = list(query.dicts())
+    response = format_response(parser=parser, data=json_data, root="races", tag="race")
+    return response
+
+
+@app.route("/api/v1/races/<int:race_id>/report/", methods=["GET"])
+@conditional_response
+@cached_response
+def race_report_api(race_id):
+    """Generate the report of one race session in JSON or XML format."""
+    parser = request.args.get("format")
+    session_name = request.args.get("session", DEFAULT_SESSION)
+    session = SessionModel.get_or_none(SessionModel.race == race_id, SessionModel.name == session_name)
+    if not session:
+        logger.error(f"Race '{race_id}' session '{session_name}' not found")
+        raise ValueError
+    fields = get_fields_arg(REPORT_FIELDS, ResultModel)
+    query = (ResultModel
+             .select(*fields)
+             .where(ResultModel.session == session)
+             .order_by(ResultModel.place))
+    after_place = get_int_arg("after_place")
+    if after_place is not None:
+        query = query.where(ResultModel.place > after_place)
+    query = filter_drivers_query(query, ResultModel).dicts()
+    if is_stream_requested():
+        return stream_response(parser=parser, rows=query.iterator())
+    json_data = list(query)
     response = format_response(parser=parser, data=json_data)
     return response
 
 
 if __name__ == "__main__":
     initialize_app()
-    app.run()
+    if os.getenv("LIVE_FOLLOW") == "1":
+        from live import LiveIngestor, follow_in_background
+
+        follow_in_background(LiveIngestor(os.getenv("ABBREVIATIONS_PATH"), os.getenv("STARTLOG_PATH"),
+                                          os.getenv("ENDLOG_PATH")))
+    app.run(threaded=True)
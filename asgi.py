@@ -0,0 +1,159 @@
+"""Asyncio (ASGI) serving mode for the report API.
+
+Run with an ASGI server, e.g.: uvicorn asgi:application --workers 4
+
+Requests are answered from a shared read-only `ReportSnapshot`, so no request waits
+on SQLite. Every SNAPSHOT_REFRESH seconds a worker thread reads the data
+generation stored in the database and rebuilds the snapshot if it changed, which
+picks up imports made by other processes. Responses are byte-identical to the
+Flask API.
+"""
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+
+from cache import current_generation
+from models import db
+from snapshot import SNAPSHOT_FIELDS, load_snapshot, query_snapshot
+from xml_writer import to_xml
+from logger.logger import create_report_logger
+
+
+load_dotenv()
+SNAPSHOT_REFRESH = float(os.getenv("SNAPSHOT_REFRESH", 5))
+DRIVERS_FIELDS = ("name", "team")
+API_PREFIX = "/api/v1/report/"
+DRIVERS_PREFIX = "/api/v1/report/drivers/"
+
+logger = create_report_logger()
+
+
+def _load_snapshot(snapshot):
+    """Return `snapshot` if it is still current, otherwise a new one from the database."""
+    with db.connection_context():
+        generation = current_generation()
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+        return load_snapshot(generation)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _int_arg(args: dict, name: str):
+    value = args.get(name)
+    if value is None:
+        return None
+    if not (value.isascii() and value.isdigit()):
+        raise BadRequest(f"Invalid {name} value {value}. Expected a non-negative integer")
+    return int(value)
+
+
+def _fields_arg(args: dict, default_fields: tuple) -> tuple:
+    fields = args.get("fields")
+    names = tuple(name.strip() for name in fields.split(",")) if fields else default_fields
+    invalid_names = [name for name in names if name not in SNAPSHOT_FIELDS]
+    if invalid_names:
+        raise BadRequest(f"Invalid fields {', '.join(invalid_names)}. "
+                         f"Supported fields: {', '.join(SNAPSHOT_FIELDS)}")
+    return names
+
+
+def render(parser: str, data) -> tuple:
+    """Serialize `data` exactly like `app.format_response` does.
+
+    Returns:
+        tuple: The content type and the encoded body.
+    """
+    if parser and parser.lower() == "json":
+        body = json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(",", ":")) + "\n"
+        return "application/json", body.encode()
+    elif parser and parser.lower() == "xml":
+        return "application/xml", to_xml(data).encode()
+    raise BadRequest(f"Invalid parser type {parser}. Supported types: JSON, XML")
+
+
+def handle_request(snapshot, path: str, args: dict) -> tuple:
+    """Route a request to the snapshot.
+
+    Returns:
+        tuple: The status code, content type and body.
+    """
+    parser = args.get("format")
+    try:
+        if path == API_PREFIX:
+            data = query_snapshot(snapshot.by_place, _fields_arg(args, SNAPSHOT_FIELDS), args.get("team"),
+                                  _int_arg(args, "after_place"), _int_arg(args, "limit"), _int_arg(args, "offset"))
+        elif path == DRIVERS_PREFIX:
+            data = query_snapshot(snapshot.by_name, _fields_arg(args, DRIVERS_FIELDS), args.get("team"),
+                                  None, _int_arg(args, "limit"), _int_arg(args, "offset"))
+        elif path.startswith(DRIVERS_PREFIX) and "/" not in path[len(DRIVERS_PREFIX):]:
+            driver = snapshot.by_abbr.get(path[len(DRIVERS_PREFIX):])
+            if not driver:
+                return 404, "text/plain", b"Not Found"
+            data = {"name": driver["name"], "team": driver["team"]}
+        else:
+            return 404, "text/plain", b"Not Found"
+        content_type, body = render(parser, data)
+        return 200, content_type, body
+    except BadRequest as error:
+        logger.error(str(error))
+        return 400, "text/plain", str(error).encode()
+
+
+class ReportApplication:
+    """ASGI application serving the report API from a shared snapshot."""
+
+    def __init__(self, refresh_interval: float = SNAPSHOT_REFRESH):
+        self.refresh_interval = refresh_interval
+        self.snapshot = None
+        self._refreshed_at = 0.0
+        self._lock = None
+
+    def _is_stale(self) -> bool:
+        return self.snapshot is None or time.monotonic() - self._refreshed_at > self.refresh_interval
+
+    async def get_snapshot(self):
+        if self._is_stale():
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._is_stale():
+                    self.snapshot = await asyncio.to_thread(_load_snapshot, self.snapshot)
+                    self._refreshed_at = time.monotonic()
+        return self.snapshot
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            status, content_type, body = 405, "text/plain", b"Method Not Allowed"
+        else:
+            args = {name: values[0] for name, values in parse_qs(scope["query_string"].decode()).items()}
+            status, content_type, body = handle_request(await self.get_snapshot(), scope["path"], args)
+        await send({"type": "http.response.start",
+                    "status": status,
+                    "headers": [(b"content-type", content_type.encode()),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.get_snapshot()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+application = ReportApplication()
@@ -0,0 +1,86 @@
+"""Load test the Flask (WSGI) and asyncio (ASGI) serving modes of the report API.
+
+Both servers run in their own process on the current database; requests are sent
+by concurrent asyncio clients, one connection per request.
+
+Usage: python -m benchmarks.bench_asgi --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    "wsgi (flask threaded)": [sys.executable, "-c",
+                              "import sys; from app import app; app.run(port=int(sys.argv[1]), threaded=True)"],
+    "asgi (uvicorn)": [sys.executable, "-m", "uvicorn", "asgi:application", "--log-level", "warning", "--port"],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server on port {port} did not start")
+
+
+async def fetch(port: int, path: str) -> float:
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    if not response.startswith(b"HTTP/1.1 200") and not response.startswith(b"HTTP/1.0 200"):
+        raise RuntimeError(response[:100])
+    return time.perf_counter() - started
+
+
+async def load(port: int, path: str, requests: int, concurrency: int) -> tuple:
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            latencies.append(await fetch(port, path))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--path", default="/api/v1/report/?format=json")
+    args = parser.parse_args()
+
+    for name, command in SERVERS.items():
+        port = free_port()
+        server = subprocess.Popen(command + [str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            asyncio.run(load(port, args.path, args.concurrency, args.concurrency))
+            elapsed, latencies = asyncio.run(load(port, args.path, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+        print(f"{name:22} {args.requests / elapsed:9.1f} req/s  p99 {p99 * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
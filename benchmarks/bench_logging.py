@@ -0,0 +1,97 @@
+"""Compare ingest and request throughput with logging disabled, synchronous and queued.
+
+Ingest loads a small report into a temporary database over and over, logging one
+summary line per load. Requests ask the API for an unknown driver, which logs an
+error every time. Calls measure the time a bare logger call takes in the calling
+thread. Every workload reports the best of --repeat runs.
+
+Usage: python -m benchmarks.bench_logging --loads 500 --requests 5000 --calls 100000
+"""
+import argparse
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+DIRECTORY = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, DIRECTORY, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DIRECTORY, 'bench.db')}"
+
+from app import app
+from db_utils import add_drivers_to_db
+from logger.logger import create_file_handler, create_queue_handler
+from race_report import format_lap_ms
+
+
+def synthetic_report(drivers: int, lap_offset: int) -> dict:
+    return {f"Driver {place}": {"place": place,
+                                "abbr": f"D{place:02d}",
+                                "team": f"TEAM {place % 10}",
+                                "best_lap": format_lap_ms(60000 + place * 10 + lap_offset)}
+            for place in range(1, drivers + 1)}
+
+
+def best_time(repeat: int, func) -> float:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - started)
+    return elapsed
+
+
+def use_handler(logger: logging.Logger, mode: str, path: str, log_format: str):
+    """Replace the handlers of `logger` for `mode`. Returns a function that stops it."""
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.disabled = mode == "disabled"
+    if mode == "disabled":
+        return lambda: None
+    file_handler = create_file_handler(path, "size", log_format)
+    if mode == "sync":
+        logger.addHandler(file_handler)
+        return file_handler.close
+    queue_handler, listener = create_queue_handler(file_handler)
+    logger.addHandler(queue_handler)
+
+    def stop():
+        listener.stop()
+        file_handler.close()
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loads", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", default="text", choices=("text", "json"))
+    args = parser.parse_args()
+
+    logger = logging.getLogger("logger.logger")
+    logger.propagate = False
+    reports = [synthetic_report(args.drivers, lap_offset) for lap_offset in (0, 1)]
+    client = app.test_client()
+    print(f"loads: {args.loads}, requests: {args.requests}, format: {args.format}")
+    for mode in ("disabled", "sync", "queued"):
+        stop = use_handler(logger, mode, os.path.join(DIRECTORY, f"{mode}.log"), args.format)
+
+        ingest_time = best_time(args.repeat, lambda: [add_drivers_to_db(reports[load % 2])
+                                                      for load in range(args.loads)])
+        request_time = best_time(args.repeat, lambda: [client.get("/api/v1/report/drivers/XXX?format=json")
+                                                       for _ in range(args.requests)])
+        call_time = best_time(args.repeat, lambda: [logger.info("Drivers loaded to DB: %d inserted", load)
+                                                    for load in range(args.calls)])
+        stop()
+
+        print(f"{mode:9} ingest {args.loads / ingest_time:9.1f} loads/s  "
+              f"requests {args.requests / request_time:9.1f} req/s  "
+              f"calls {call_time / args.calls * 1e6:7.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
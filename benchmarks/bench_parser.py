@@ -0,0 +1,68 @@
+"""Compare the text/strptime parser with the streaming and vectorized parsers.
+
+Usage: python -m benchmarks.bench_parser --lines 10000000
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+import tracemalloc
+
+from race_report import drivers_best_lap, drivers_best_lap_ms, drivers_best_lap_vectorized, format_lap_ms
+from benchmarks.synthetic import write_logs
+
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def measure(func, *args, repeat: int = 3):
+    """Return the result, best wall time and peak traced memory of `func(*args)`.
+
+    Timing and memory are measured in separate runs because tracemalloc slows
+    allocation-heavy code down considerably.
+    """
+    elapsed = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = min(elapsed, time.perf_counter() - started)
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=10_000_000)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        start_path = os.path.join(directory, "start.log")
+        end_path = os.path.join(directory, "end.log")
+        write_logs(start_path, end_path, args.lines, args.drivers)
+
+        expected, text_time, text_peak = measure(drivers_best_lap, start_path, end_path, repeat=args.repeat)
+        result, stream_time, stream_peak = measure(drivers_best_lap_ms, start_path, end_path, repeat=args.repeat)
+        formatted = [(driver_abbr, format_lap_ms(lap_ms)) for driver_abbr, lap_ms in result.items()]
+        assert formatted == list(expected.items())
+        if HAS_NUMPY:
+            result, vector_time, vector_peak = measure(drivers_best_lap_vectorized, start_path, end_path,
+                                                       repeat=args.repeat)
+            assert list(result.items()) == list(expected.items())
+
+    print(f"lines: {args.lines}, drivers: {args.drivers}")
+    print(f"drivers_best_lap     {text_time:8.3f} s  peak {text_peak / 2**20:8.2f} MiB")
+    print(f"drivers_best_lap_ms  {stream_time:8.3f} s  peak {stream_peak / 2**20:8.2f} MiB")
+    print(f"speedup              {text_time / stream_time:8.2f}x")
+    if HAS_NUMPY:
+        print(f"vectorized           {vector_time:8.3f} s  peak {vector_peak / 2**20:8.2f} MiB")
+        print(f"speedup              {text_time / vector_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
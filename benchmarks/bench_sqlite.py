@@ -0,0 +1,133 @@
+"""Measure how readers are served while a bulk import writes to the drivers table.
+
+Reader threads open a connection, look a driver up and close it again, like a
+request does. Meanwhile a writer process replaces every row in a single
+transaction. The run is repeated with SQLite's default settings (rollback journal,
+2 MiB page cache) and with the tuned DB_PRAGMAS (WAL).
+
+Usage: python -m benchmarks.bench_sqlite --rows 100000 --readers 8
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from peewee import OperationalError
+
+from models import DB_PRAGMAS, DriverModel, create_database
+from race_report import format_lap_ms
+
+
+def driver_rows(count: int, lap_offset: int = 0) -> list:
+    return [{"place": place,
+             "name": f"Driver {place}",
+             "abbr": f"{place:03d}"[-3:],
+             "team": f"TEAM {place % 10}",
+             "best_lap": format_lap_ms(60000 + place + lap_offset),
+             "best_lap_ms": 60000 + place + lap_offset}
+            for place in range(1, count + 1)]
+
+
+def import_rows(path: str, pragmas: dict, rows: int):
+    """Replace every driver row in one transaction, like a bulk import in another process."""
+    database = create_database(path, pragmas=pragmas, pooled=False)
+    new_rows = driver_rows(rows, lap_offset=1)
+    with database.bind_ctx([DriverModel]), database.connection_context():
+        with database.atomic():
+            for batch in range(0, rows, 1000):
+                DriverModel.insert_many(new_rows[batch:batch + 1000]).on_conflict_replace().execute()
+
+
+def import_or_exit(path: str, pragmas: dict, rows: int):
+    try:
+        import_rows(path, pragmas, rows)
+    except OperationalError:
+        sys.exit(1)
+
+
+def run(pragmas: dict, rows: int, readers: int, pooled: bool, directory: str, timeout: float) -> dict:
+    path = os.path.join(directory, "bench.db")
+    database = create_database(path, pragmas=pragmas, pooled=pooled)
+    with database.bind_ctx([DriverModel]):
+        database.create_tables([DriverModel])
+        initial_rows = driver_rows(rows)
+        with database.atomic():
+            for batch in range(0, rows, 1000):
+                DriverModel.insert_many(initial_rows[batch:batch + 1000]).execute()
+        database.close()
+
+        importing = threading.Event()
+        stop = threading.Event()
+        latencies = []
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    database.connect(reuse_if_open=True)
+                    DriverModel.select().where(DriverModel.place == random.randint(1, rows)).dicts().get()
+                except OperationalError as error:
+                    errors.append(error)
+                finally:
+                    database.close()
+                if importing.is_set():
+                    latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=read) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        writer = multiprocessing.get_context("spawn").Process(target=import_or_exit, args=(path, pragmas, rows))
+        importing.set()
+        started = time.perf_counter()
+        writer.start()
+        writer.join(timeout)
+        import_time = time.perf_counter() - started
+        if writer.is_alive():
+            writer.terminate()
+            writer.join()
+            status = "timed out"
+        else:
+            status = "failed" if writer.exitcode else "done"
+        importing.clear()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        if pooled:
+            database.close_all()
+
+    latencies.sort()
+    return {"status": status,
+            "import_time": import_time,
+            "reads": len(latencies),
+            "p99": latencies[int(len(latencies) * 0.99)] if latencies else float("nan"),
+            "max": latencies[-1] if latencies else float("nan"),
+            "errors": len(errors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--pooled", action="store_true", help="Use the pooled connection mode for readers")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds before the import is stopped")
+    parser.add_argument("--directory", help="Where to create the database, a temporary directory by default")
+    args = parser.parse_args()
+
+    print(f"rows: {args.rows}, readers: {args.readers}, pooled: {args.pooled}")
+    for name, pragmas in (("default", {}), ("tuned", DB_PRAGMAS)):
+        with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+            result = run(pragmas, args.rows, args.readers, args.pooled, directory, args.timeout)
+        print(f"{name:7} import {result['status']:9} {result['import_time']:6.2f} s  "
+              f"reads during import {result['reads']:7}  "
+              f"p99 {result['p99'] * 1000:8.2f} ms  max {result['max'] * 1000:8.2f} ms  "
+              f"errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Compare dict2xml with xml_writer on report-shaped rows.
+
+Usage: python -m benchmarks.bench_xml --rows 1000
+"""
+import argparse
+import timeit
+
+from dict2xml import dict2xml
+
+from xml_writer import to_xml
+from benchmarks.synthetic import driver_abbreviations, TEAMS
+
+
+def report_rows(rows: int) -> list:
+    return [{"name": f"Driver {abbr}", "place": place, "team": TEAMS[place % len(TEAMS)],
+             "best_lap": f"0:01:{place % 60:02d}.{place % 1000:03d}", "abbr": abbr}
+            for place, abbr in enumerate(driver_abbreviations(rows), 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    data = report_rows(args.rows)
+    dict2xml_time = min(timeit.repeat(lambda: dict2xml(data), number=args.number, repeat=3)) / args.number
+    writer_time = min(timeit.repeat(lambda: to_xml(data), number=args.number, repeat=3)) / args.number
+
+    print(f"rows: {args.rows}")
+    print(f"dict2xml    {dict2xml_time * 1000:9.3f} ms")
+    print(f"xml_writer  {writer_time * 1000:9.3f} ms")
+    print(f"speedup     {dict2xml_time / writer_time:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
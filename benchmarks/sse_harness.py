@@ -0,0 +1,79 @@
+"""Simulate many concurrent subscribers of /api/v1/report/stream.
+
+Starts the app on a local port, connects --subscribers streaming clients, publishes
+--events standings deltas and reports how many were delivered and how fast.
+
+Usage: python -m benchmarks.sse_harness --subscribers 200 --events 50
+"""
+import argparse
+import http.client
+import json
+import logging
+import statistics
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from app import app
+from events import standings_events
+
+
+def subscriber(port: int, events: int, latencies: list, ready: threading.Barrier):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    connection.request("GET", "/api/v1/report/stream")
+    response = connection.getresponse()
+    response.readline()
+    response.readline()
+    ready.wait()
+    received = 0
+    while received < events:
+        line = response.readline()
+        if line.startswith(b"data: "):
+            sent_at = json.loads(line[6:])[0]["sent_at"]
+            latencies.append(time.perf_counter() - sent_at)
+            received += 1
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between published events")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies = []
+    ready = threading.Barrier(args.subscribers + 1)
+    clients = [threading.Thread(target=subscriber, args=(server.port, args.events, latencies, ready), daemon=True)
+               for _ in range(args.subscribers)]
+    for client in clients:
+        client.start()
+    ready.wait()
+    while len(standings_events) < args.subscribers:
+        time.sleep(0.01)
+
+    started = time.perf_counter()
+    for place in range(args.events):
+        standings_events.publish([{"place": place % 20 + 1, "abbr": "SVF", "sent_at": time.perf_counter()}])
+        time.sleep(args.interval)
+    for client in clients:
+        client.join(timeout=30)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    expected = args.subscribers * args.events
+    latencies.sort()
+    print(f"subscribers: {args.subscribers}, events: {args.events}")
+    print(f"delivered    {len(latencies)}/{expected} in {elapsed:.3f} s")
+    if latencies:
+        print(f"latency p50  {statistics.median(latencies) * 1000:8.2f} ms")
+        print(f"latency p99  {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Benchmark suite for parsing, ingestion and API serving on synthetic data.
+
+Generates abbreviations and start/end logs with --laps laps (10^3 to 10^7), then
+times the report functions, add_drivers_to_db and every route through the Flask
+test client. Routes are timed with the response and page caches cleared, so each
+call renders its response. Results are written as JSON; with --compare, the best
+(or median) times are compared with an earlier result file and the run fails on
+regressions.
+
+Usage:
+    python -m benchmarks.suite --laps 100000 --output baseline.json
+    python -m benchmarks.suite --laps 100000 --output current.json --compare baseline.json
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRECTORY = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, DIRECTORY, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DIRECTORY, 'bench.db')}"
+
+from app import app
+from cache import response_cache, page_cache
+from db_utils import add_drivers_to_db, add_race_to_db
+from models import RaceModel
+from race_report import abbr_decoder, read_race_data, drivers_best_lap, build_report, format_lap_ms, parse_lap_ms
+from benchmarks.synthetic import write_dataset
+
+
+def measure(func, repeat: int) -> dict:
+    """Run `func` `repeat` times and summarize the wall times in seconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return {"runs": repeat,
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "stdev": statistics.stdev(times) if repeat > 1 else 0.0}
+
+
+def route_cases(report: dict) -> dict:
+    """Return the URL requested for each route."""
+    driver_abbr = next(iter(report.values()))["abbr"]
+    race_id = RaceModel.select(RaceModel.id).scalar()
+    return {"index": "/",
+            "report": "/report/",
+            "report_desc": "/report/?order=desc",
+            "report_drivers": "/report/drivers/",
+            "report_driver": f"/report/drivers/{driver_abbr}",
+            "report_api_json": "/api/v1/report/?format=json",
+            "report_api_xml": "/api/v1/report/?format=xml",
+            "report_api_stream": "/api/v1/report/?format=json&stream=true",
+            "report_drivers_api": "/api/v1/report/drivers/?format=json",
+            "report_driver_api": f"/api/v1/report/drivers/{driver_abbr}?format=json",
+            "races_api": "/api/v1/races/?format=json",
+            "race_report_api": f"/api/v1/races/{race_id}/report/?format=json",
+            "metrics": "/metrics"}
+
+
+def run_suite(laps: int, drivers: int, repeat: int) -> dict:
+    abbreviations_path, startlog_path, endlog_path = write_dataset(os.path.join(DIRECTORY, "data"), laps, drivers)
+    drivers_info = abbr_decoder(abbreviations_path)
+    best_laps = drivers_best_lap(startlog_path, endlog_path)
+    report = build_report(drivers_info, best_laps)
+    add_race_to_db(report, race_name="Benchmark Grand Prix")
+
+    results = {"read_race_data": measure(lambda: read_race_data(startlog_path), repeat),
+               "drivers_best_lap": measure(lambda: drivers_best_lap(startlog_path, endlog_path), repeat),
+               "build_report": measure(lambda: build_report(drivers_info, best_laps), repeat)}
+
+    changed_report = {name: dict(driver, best_lap=format_lap_ms(parse_lap_ms(driver["best_lap"]) + 1))
+                      for name, driver in report.items()}
+    reports = [report, changed_report]
+    runs = iter(range(repeat))
+    results["add_drivers_to_db"] = measure(lambda: add_drivers_to_db(reports[next(runs) % 2]), repeat)
+    add_drivers_to_db(report)
+
+    client = app.test_client()
+
+    def request(url: str):
+        response_cache.clear()
+        page_cache.clear()
+        response = client.get(url)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+
+    for name, url in route_cases(report).items():
+        results[f"route:{name}"] = measure(lambda: request(url), repeat)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float, statistic: str = "min") -> list:
+    """Print `statistic` of every benchmark next to the baseline.
+
+    Returns:
+        list: Names of the benchmarks whose `statistic` grew by more than `threshold`.
+    """
+    regressions = []
+    print(f"{'benchmark':32} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:32} {'-':>12} {result[statistic] * 1000:10.3f}ms {'new':>8}")
+            continue
+        change = result[statistic] / baseline[name][statistic] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32} {baseline[name][statistic] * 1000:10.3f}ms {result[statistic] * 1000:10.3f}ms "
+              f"{change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--laps", type=int, default=1000, help="Laps in the synthetic logs, 10^3 to 10^7")
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative growth reported as a regression")
+    parser.add_argument("--statistic", default="min", choices=("min", "median", "mean"),
+                        help="Statistic compared; the minimum is the least sensitive to noise")
+    args = parser.parse_args()
+
+    results = run_suite(args.laps, args.drivers, args.repeat)
+    document = {"meta": {"laps": args.laps,
+                         "drivers": args.drivers,
+                         "repeat": args.repeat,
+                         "python": platform.python_version(),
+                         "platform": platform.platform(),
+                         "revision": git_revision(),
+                         "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if (baseline["meta"]["laps"], baseline["meta"]["drivers"]) != (args.laps, args.drivers):
+            print("Warning: the baseline was measured on a different data scale")
+        regressions = compare(results, baseline["results"], args.threshold, args.statistic)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        for name, result in results.items():
+            print(f"{name:32} median {result['median'] * 1000:10.3f} ms  min {result['min'] * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Synthetic abbreviations and start/end timing logs for benchmarks.
+
+Usage: python -m benchmarks.synthetic DIRECTORY --laps 1000000 --drivers 20
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+from itertools import product
+from string import ascii_uppercase
+
+
+RACE_START = datetime(2018, 5, 24, 12, 0, 0)
+TEAMS = ["FERRARI", "MERCEDES", "RED BULL RACING TAG HEUER", "MCLAREN RENAULT",
+         "WILLIAMS MERCEDES", "RENAULT", "SAUBER FERRARI", "HAAS FERRARI"]
+
+
+def driver_abbreviations(drivers: int) -> list:
+    """Return `drivers` unique three-letter abbreviations."""
+    return ["".join(letters) for letters, _ in zip(product(ascii_uppercase, repeat=3), range(drivers))]
+
+
+def write_abbreviations(path: str, drivers: int):
+    with open(path, "w") as file:
+        for number, abbr in enumerate(driver_abbreviations(drivers)):
+            file.write(f"{abbr}_Driver {abbr}_{TEAMS[number % len(TEAMS)]}\n")
+
+
+def write_logs(start_path: str, end_path: str, lines: int, drivers: int = 20, seed: int = 0):
+    """Write `lines` start and end records, round-robin over `drivers` drivers.
+
+    Every driver gets consecutive laps of 60-90 seconds, so the k-th start of a driver
+    pairs with the k-th end of the same driver.
+    """
+    rng = random.Random(seed)
+    abbrs = driver_abbreviations(drivers)
+    clocks = [RACE_START + timedelta(milliseconds=rng.randrange(60_000)) for _ in abbrs]
+    with open(start_path, "w") as start_file, open(end_path, "w") as end_file:
+        start_buffer, end_buffer = [], []
+        for line in range(lines):
+            index = line % drivers
+            start = clocks[index]
+            finish = start + timedelta(milliseconds=rng.randrange(60_000, 90_000))
+            clocks[index] = finish
+            start_buffer.append(f"{abbrs[index]}{start:%Y-%m-%d_%H:%M:%S}.{start.microsecond // 1000:03d}\n")
+            end_buffer.append(f"{abbrs[index]}{finish:%Y-%m-%d_%H:%M:%S}.{finish.microsecond // 1000:03d}\n")
+            if len(start_buffer) == 100_000:
+                start_file.writelines(start_buffer)
+                end_file.writelines(end_buffer)
+                start_buffer, end_buffer = [], []
+        start_file.writelines(start_buffer)
+        end_file.writelines(end_buffer)
+
+
+def write_dataset(directory: str, laps: int, drivers: int = 20, seed: int = 0) -> tuple:
+    """Write abbreviations.txt, start.log and end.log with `laps` laps to `directory`.
+
+    Returns:
+        tuple: The abbreviations, start log and end log paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = tuple(os.path.join(directory, name) for name in ("abbreviations.txt", "start.log", "end.log"))
+    write_abbreviations(paths[0], drivers)
+    write_logs(paths[1], paths[2], laps, drivers, seed)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--laps", type=int, default=1000)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in write_dataset(args.directory, args.laps, args.drivers, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
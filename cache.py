@@ -0,0 +1,277 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, make_response
+from peewee import DatabaseError
+
+from models import DataVersionModel
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", 64))
+
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", 1))
+
+class VersionTracker:
+    """Data version stored in the database, bumped in the transaction of every write.
+
+    All processes sharing the database see the same version, so a write from an
+    import job or another worker invalidates the caches of this one. The stored
+    version is read again at most every `ttl` seconds; writes made by this process
+    are seen at once.
+    """
+
+    def __init__(self, ttl: float = DATA_VERSION_TTL):
+        self.ttl = ttl
+        self._state = (0, 0)
+        self._checked_at = None
+
+    def get(self) -> tuple:
+        """Return the version and the Unix time of the last change."""
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.ttl:
+            self.reload()
+        return self._state
+
+    def reload(self):
+        """Read the stored version. On a database error the last known version is kept."""
+        try:
+            state = (DataVersionModel
+                     .select(DataVersionModel.version, DataVersionModel.modified)
+                     .where(DataVersionModel.id == 1)
+                     .tuples()
+                     .first())
+        except DatabaseError:
+            state = self._state
+        self._state = state or (0, 0)
+        self._checked_at = time.monotonic()
+
+    def bump(self):
+        """Increment the stored version. Must run inside the transaction of the write.
+
+        The new version is not taken over here: until the transaction commits, other
+        connections still read the old data, which must not be labelled with it.
+        Call `reload` once the transaction has committed.
+        """
+        modified = int(time.time())
+        DataVersionModel._meta.database.create_tables([DataVersionModel])
+        (DataVersionModel
+         .insert(id=1, version=1, modified=modified)
+         .on_conflict(conflict_target=[DataVersionModel.id],
+                      update={DataVersionModel.version: DataVersionModel.version + 1,
+                              DataVersionModel.modified: modified})
+         .execute())
+
+    def clear(self):
+        """Forget the version read last, so the next `get` reads it again."""
+        self._state = (0, 0)
+        self._checked_at = None
+
+
+version_tracker = VersionTracker()
+
+
+def current_generation() -> int:
+    """Return the data generation, bumped every time the ingest path changes the data."""
+    return version_tracker.get()[0]
+
+
+@contextmanager
+def data_transaction():
+    """Run a write to the report data in a transaction that bumps the data version.
+
+    The new version is read only after the transaction commits, so a request served
+    meanwhile never caches data read before the commit under the new version.
+    """
+    database = DataVersionModel._meta.database
+    with database.atomic():
+        yield
+        version_tracker.bump()
+    if not database.in_transaction():
+        version_tracker.reload()
+
+
+def bump_generation() -> int:
+    """Mark all cached data as stale, in a transaction of its own."""
+    with data_transaction():
+        pass
+    return current_generation()
+
+
+def data_version() -> str:
+    """Return a version string that changes whenever the data changes.
+
+    The stored version is combined with the time of the change, so versions are not
+    reused if the database is recreated.
+    """
+    version, modified = version_tracker.get()
+    return f"{version}-{modified}"
+
+
+def last_modified() -> datetime:
+    """Return the time of the last data change, in whole seconds as used by HTTP dates."""
+    return datetime.fromtimestamp(version_tracker.get()[1], timezone.utc)
+
+
+class ResponseCache:
+    """Size-bounded LRU cache whose entries expire when the data generation changes."""
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            generation, value = entry
+            if generation != current_generation():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (current_generation(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
+page_cache = ResponseCache(PAGE_CACHE_SIZE)
+
+
+PAGE_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding() -> str:
+    """Return the best pre-compressed content coding accepted by the request."""
+    return request.accept_encodings.best_match(PAGE_ENCODINGS, default="identity")
+
+
+class CompressedPage:
+    """A rendered HTML page with its pre-compressed variants, keyed by content coding."""
+
+    __slots__ = ("variants",)
+
+    def __init__(self, html: str):
+        body = html.encode()
+        self.variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+
+
+def _request_etag(suffix: str = "") -> str:
+    """Return the strong ETag of the requested URL at the current data version."""
+    return hashlib.sha1(f"{data_version()}:{request.full_path}{suffix}".encode()).hexdigest()
+
+
+def _is_not_modified(etag: str, modified: datetime) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    return request.if_modified_since is not None and request.if_modified_since >= modified
+
+
+def cached_response(view):
+    """Serve successful responses of `view` from `response_cache`.
+
+    The key is the endpoint with its view and query arguments, which covers the
+    response format and sort order. Only the rendered body is kept, so a hit skips
+    the database query and serialization.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.endpoint, tuple(sorted(kwargs.items())), tuple(sorted(request.args.items(multi=True))))
+        cached = response_cache.get(key)
+        if cached is not None:
+            body, status, content_type = cached
+            response = make_response(body, status)
+            response.content_type = content_type
+            return response
+
+        generation = current_generation()
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed and generation == current_generation():
+            response_cache.set(key, (response.get_data(), response.status_code, response.content_type))
+        return response
+    return wrapper
+
+
+def conditional_response(view):
+    """Answer conditional GET requests for `view` with 304 Not Modified.
+
+    The strong ETag is derived from the data version and the requested URL, so a
+    matching If-None-Match (or a fresh If-Modified-Since) is answered before the view
+    runs, skipping both the database query and the rendering.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = _request_etag()
+        modified = last_modified()
+        if _is_not_modified(etag, modified):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+        if response.status_code in (200, 304):
+            response.set_etag(etag)
+            response.last_modified = modified
+        return response
+    return wrapper
+
+
+def precompressed_page(view):
+    """Serve the HTML page rendered by `view` from `page_cache`, compressed ahead of time.
+
+    The page is rendered and compressed with gzip (and brotli, if installed) once per
+    URL and data generation, so a hit costs a dictionary lookup. Each content coding
+    is a different representation and gets its own ETag. Conditional requests are
+    answered like `conditional_response` does.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        coding = negotiate_encoding()
+        etag = _request_etag("" if coding == "identity" else f";{coding}")
+        modified = last_modified()
+        if _is_not_modified(etag, modified):
+            response = make_response("", 304)
+        else:
+            key = (request.endpoint, tuple(sorted(kwargs.items())), tuple(sorted(request.args.items(multi=True))))
+            page = page_cache.get(key)
+            if page is None:
+                generation = current_generation()
+                page = CompressedPage(view(*args, **kwargs))
+                if generation == current_generation():
+                    page_cache.set(key, page)
+            response = make_response(page.variants[coding])
+            response.content_type = "text/html; charset=utf-8"
+            if coding != "identity":
+                response.content_encoding = coding
+        response.vary.add("Accept-Encoding")
+        response.set_etag(etag)
+        response.last_modified = modified
+        return response
+    return wrapper
@@ -1,20 +1,296 @@
-from models import db, DriverModel
+import hashlib
+import io
+import os
+from contextlib import contextmanager
+
+from peewee import PostgresqlDatabase, chunked
+
+from models import db, DriverModel, RaceModel, SessionModel, ResultModel, InputFileModel
+from race_report import parse_lap_ms, format_lap_ms
 from logger.logger import create_report_logger
+from cache import data_transaction
+from events import standings_events, standings_delta
+from metrics import timed_stage
+from snapshot import report_snapshot
+
 
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 500))
+UPSERT_FIELDS = [DriverModel.place, DriverModel.name, DriverModel.abbr, DriverModel.team,
+                 DriverModel.best_lap, DriverModel.best_lap_ms]
+RACE_MODELS = [RaceModel, SessionModel, ResultModel]
+RESULT_FIELDS = [ResultModel.place, ResultModel.name, ResultModel.abbr, ResultModel.team,
+                 ResultModel.best_lap, ResultModel.best_lap_ms, ResultModel.race, ResultModel.session]
+DEFAULT_SESSION = "Race"
+HASH_CHUNK_SIZE = 1024 * 1024
 
 logger = create_report_logger()
 
-def add_drivers_to_db(report: dict):
-    """Add drivers information to the database. """
+
+@contextmanager
+def _connection():
+    """Hold a connection for the block, reusing the caller's connection if one is open."""
+    if not db.is_closed():
+        yield
+        return
+    with db.connection_context():
+        yield
+
+
+def migrate_db():
+    """Create the drivers table or bring an existing one up to date with DriverModel."""
     if not DriverModel.table_exists():
         db.create_tables([DriverModel])
         logger.info("DriverModel table created")
-    with db:
-        for driver_name, driver in report.items():
-            existing_driver = DriverModel.get_or_none(DriverModel.name == driver_name)
-            if not existing_driver:
-                DriverModel(name=driver_name,
-                            abbr=driver.get("abbr"),
-                            team=driver.get("team"),
-                            best_lap=driver.get("best_lap")).save()
-                logger.info(f"Driver {driver_name} ({driver.get('abbr')}) added to DB")
+        return
+
+    table_name = DriverModel._meta.table_name
+    columns = {column.name for column in db.get_columns(table_name)}
+    if "best_lap_ms" not in columns:
+        from playhouse.migrate import SchemaMigrator, migrate
+
+        with db.atomic():
+            migrate(SchemaMigrator.from_database(db).add_column(table_name, "best_lap_ms", DriverModel.best_lap_ms))
+            for place, best_lap in DriverModel.select(DriverModel.place, DriverModel.best_lap).tuples():
+                try:
+                    best_lap_ms = parse_lap_ms(best_lap)
+                except ValueError:
+                    logger.warning(f"Invalid best lap {best_lap!r} at place {place}. "
+                                   f"best_lap_ms is left empty until the next import.")
+                    continue
+                (DriverModel
+                 .update(best_lap_ms=best_lap_ms)
+                 .where(DriverModel.place == place)
+                 .execute())
+        logger.info("Column best_lap_ms added to DriverModel table")
+
+
+def _report_rows(report: dict) -> list:
+    """Convert a `build_report` dictionary into database rows."""
+    return [{"place": driver.get("place"),
+             "name": driver_name,
+             "abbr": driver.get("abbr"),
+             "team": driver.get("team"),
+             "best_lap": driver.get("best_lap"),
+             "best_lap_ms": parse_lap_ms(driver.get("best_lap"))}
+            for driver_name, driver in report.items()]
+
+
+def _upsert_rows(model, rows: list, existing_rows: dict, conflict_target: list, batch_size: int,
+                 scope=None) -> tuple:
+    """Upsert the rows that differ from `existing_rows` (keyed by place) in batched transactions.
+
+    Existing rows at places missing from `rows` are deleted in the transaction of the
+    last batch. `scope` restricts the deletion, e.g. to one race session.
+
+    Returns:
+        tuple: The number of "inserted", "updated", "skipped" (unchanged) and "deleted"
+               rows, the written rows and the deleted places.
+    """
+    summary = {"inserted": 0, "updated": 0, "skipped": 0, "deleted": 0}
+    existing_names = {row["name"] for row in existing_rows.values()}
+    changed_rows = []
+    for row in rows:
+        if existing_rows.get(row["place"]) == row:
+            summary["skipped"] += 1
+            continue
+        summary["updated" if row["name"] in existing_names else "inserted"] += 1
+        changed_rows.append(row)
+    places = {row["place"] for row in rows}
+    stale_places = [place for place in existing_rows if place not in places]
+    summary["deleted"] = len(stale_places)
+
+    conflict_names = {field.name for field in conflict_target}
+    preserve = [getattr(model, name) for name in rows[0] if name not in conflict_names] if rows else []
+    batches = list(chunked(changed_rows, batch_size))
+    if stale_places and not batches:
+        batches.append([])
+    for index, batch in enumerate(batches, 1):
+        with data_transaction():
+            if batch:
+                _bulk_upsert(model, batch, conflict_target, preserve)
+            if stale_places and index == len(batches):
+                query = model.delete().where(model.place.in_(stale_places))
+                if scope is not None:
+                    query = query.where(scope)
+                query.execute()
+    return summary, changed_rows, stale_places
+
+
+def _copy_value(value) -> str:
+    """Encode a value for the text format of PostgreSQL COPY."""
+    if value is None:
+        return "\\N"
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+
+def _copy_rows(rows: list, columns: list) -> io.StringIO:
+    """Write rows as tab-separated COPY input."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[column]) for column in columns) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _bulk_upsert(model, rows: list, conflict_target: list, preserve: list):
+    """Insert rows, overwriting the `preserve` fields of rows that already exist.
+
+    On PostgreSQL the rows are streamed with COPY into a temporary table and merged
+    with one INSERT ... ON CONFLICT, which is much faster than a multi-row INSERT.
+    Other databases use `insert_many`. Must run inside a transaction.
+    """
+    if not isinstance(db, PostgresqlDatabase):
+        model.insert_many(rows).on_conflict(conflict_target=conflict_target, preserve=preserve).execute()
+        return
+
+    table = model._meta.table_name
+    staging = db.quote(f"{table}_staging")
+    columns = list(rows[0])
+    column_list = ", ".join(db.quote(model._meta.fields[name].column_name) for name in columns)
+    conflict_list = ", ".join(db.quote(field.column_name) for field in conflict_target)
+    updates = ", ".join(f"{db.quote(field.column_name)} = EXCLUDED.{db.quote(field.column_name)}"
+                        for field in preserve)
+    cursor = db.cursor()
+    cursor.execute(f"CREATE TEMPORARY TABLE {staging} (LIKE {db.quote(table)} INCLUDING DEFAULTS) ON COMMIT DROP")
+    cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN", _copy_rows(rows, columns))
+    cursor.execute(f"INSERT INTO {db.quote(table)} ({column_list}) SELECT {column_list} FROM {staging} "
+                   f"ON CONFLICT ({conflict_list}) DO UPDATE SET {updates}")
+
+
+@timed_stage("add_drivers_to_db")
+def add_drivers_to_db(report: dict, batch_size: int = INGEST_BATCH_SIZE) -> dict:
+    """Insert or update drivers information in the database.
+
+    Rows are upserted by place with `insert_many`, one transaction per `batch_size` rows,
+    so a changed lap time or a new standing overwrites the stored row. Rows at places
+    beyond the new standings are deleted.
+
+    Returns:
+        dict: The number of "inserted", "updated", "skipped" (unchanged) and "deleted" drivers.
+    """
+    migrate_db()
+    with _connection():
+        existing_rows = {row["place"]: row for row in DriverModel.select(*UPSERT_FIELDS).dicts()}
+        summary, changed_rows, deleted_places = _upsert_rows(DriverModel, _report_rows(report), existing_rows,
+                                                             [DriverModel.place], batch_size)
+        report_snapshot.refresh()
+    standings_events.publish(standings_delta(changed_rows, deleted_places))
+    logger.info(f"Drivers loaded to DB: {summary['inserted']} inserted, "
+                f"{summary['updated']} updated, {summary['skipped']} skipped, {summary['deleted']} deleted")
+    return summary
+
+
+def update_standings(entries: list, drivers_info: dict, total_places: int = None) -> list:
+    """Rewrite only the given standings rows in one transaction.
+
+    Args:
+        entries (list): (place, abbreviation, lap ms) tuples of the places that changed,
+                        e.g. from `Leaderboard.entries`.
+        drivers_info (dict): Driver abbreviations mapped to their name and team.
+        total_places (int): Number of places in the standings. Rows at higher places,
+                            e.g. left over from an earlier import, are deleted.
+
+    Returns:
+        list: The written rows.
+    """
+    rows = [{"place": place,
+             "name": drivers_info[driver_abbr]["name"],
+             "abbr": driver_abbr,
+             "team": drivers_info[driver_abbr]["team"],
+             "best_lap": format_lap_ms(lap_ms),
+             "best_lap_ms": lap_ms}
+            for place, driver_abbr, lap_ms in entries]
+    if not rows:
+        return rows
+    with _connection():
+        with data_transaction():
+            _bulk_upsert(DriverModel, rows, [DriverModel.place], UPSERT_FIELDS[1:])
+            deleted_places = []
+            if total_places is not None:
+                stale_rows = DriverModel.select(DriverModel.place).where(DriverModel.place > total_places)
+                deleted_places = [row.place for row in stale_rows]
+                DriverModel.delete().where(DriverModel.place > total_places).execute()
+        report_snapshot.refresh()
+    standings_events.publish(standings_delta(rows, deleted_places))
+    return rows
+
+
+def get_race_session(race_name: str, session_name: str = DEFAULT_SESSION, season: int = None) -> SessionModel:
+    """Get or create the session `session_name` of a race."""
+    race, _ = RaceModel.get_or_create(name=race_name, season=season)
+    session, _ = SessionModel.get_or_create(race=race, name=session_name)
+    return session
+
+
+def add_race_to_db(report: dict, race_name: str, session_name: str = DEFAULT_SESSION,
+                   season: int = None, batch_size: int = INGEST_BATCH_SIZE) -> dict:
+    """Insert or update the results of one race session, keyed by (session, place).
+
+    Results of the session at places beyond the new report are deleted.
+
+    Returns:
+        dict: The number of "inserted", "updated", "skipped" (unchanged) and "deleted" results.
+    """
+    with _connection():
+        db.create_tables(RACE_MODELS)
+        with db.atomic():
+            session = get_race_session(race_name, session_name, season)
+        rows = [dict(row, race=session.race_id, session=session.id) for row in _report_rows(report)]
+        existing_rows = {row["place"]: row for row in
+                         ResultModel.select(*RESULT_FIELDS).where(ResultModel.session == session).dicts()}
+        summary, _, _ = _upsert_rows(ResultModel, rows, existing_rows,
+                                  [ResultModel.session, ResultModel.place], batch_size,
+                                  scope=ResultModel.session == session)
+    logger.info(f"Race {race_name} ({session_name}) loaded to DB: {summary['inserted']} inserted, "
+                f"{summary['updated']} updated, {summary['skipped']} skipped, {summary['deleted']} deleted")
+    return summary
+
+
+def file_fingerprint(path_to_file: str, stored: dict = None) -> dict:
+    """Fingerprint a file by size, modification time and SHA-256 of its content.
+
+    If the size and modification time match the `stored` fingerprint, its hash is
+    reused instead of reading the file again.
+    """
+    stat = os.stat(path_to_file)
+    fingerprint = {"path": os.path.abspath(path_to_file), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if stored and (stored["size"], stored["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        fingerprint["sha256"] = stored["sha256"]
+        return fingerprint
+    digest = hashlib.sha256()
+    with open(path_to_file, "rb") as file:
+        for block in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+def check_input_files(paths: list) -> tuple:
+    """Compare input files with the fingerprints stored when they were last loaded.
+
+    Returns:
+        tuple: The current fingerprints, and whether the database already holds the
+               data of exactly these files.
+    """
+    with _connection():
+        if not InputFileModel.table_exists() or not DriverModel.table_exists():
+            return [file_fingerprint(path) for path in paths], False
+        stored_rows = {row["path"]: row for row in InputFileModel.select().dicts()}
+        fingerprints = [file_fingerprint(path, stored_rows.get(os.path.abspath(path))) for path in paths]
+        unchanged = (all(stored_rows.get(fingerprint["path"], {}).get("sha256") == fingerprint["sha256"]
+                         for fingerprint in fingerprints)
+                     and DriverModel.select().exists())
+    return fingerprints, unchanged
+
+
+def store_input_files(fingerprints: list):
+    """Replace the stored input file fingerprints, after their data has been loaded."""
+    with _connection():
+        db.create_tables([InputFileModel])
+        with db.atomic():
+            InputFileModel.delete().execute()
+            InputFileModel.insert_many(fingerprints).execute()
@@ -0,0 +1,36 @@
+import threading
+
+from flask import Flask
+
+
+DOCS_PREFIXES = ("/apidocs", "/apispec", "/flasgger_static", "/oauth2-redirect.html")
+
+
+class LazySwaggerMiddleware:
+    """WSGI middleware serving the Swagger UI from an app created on its first request.
+
+    flasgger and its dependencies take longer to import than the rest of the
+    application, so they are only loaded once the API docs are actually requested.
+    """
+
+    def __init__(self, wsgi_app, template_file: str):
+        self.wsgi_app = wsgi_app
+        self.template_file = template_file
+        self._docs_app = None
+        self._lock = threading.Lock()
+
+    def docs_app(self) -> Flask:
+        if self._docs_app is None:
+            with self._lock:
+                if self._docs_app is None:
+                    from flasgger import Swagger
+
+                    docs_app = Flask(__name__)
+                    Swagger(docs_app, template_file=self.template_file)
+                    self._docs_app = docs_app
+        return self._docs_app
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(DOCS_PREFIXES):
+            return self.docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,76 @@
+import os
+import queue
+import threading
+
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", 100))
+
+
+class Subscription:
+    """Queue of standings deltas for one subscriber."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, rows: list):
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float = None) -> list:
+        """Return the next delta. Raises `queue.Empty` if none arrives within `timeout`."""
+        return self._queue.get(timeout=timeout)
+
+
+class Broadcaster:
+    """Fans standings deltas out to every subscriber.
+
+    A subscriber that does not keep up is marked as overflowed instead of slowing
+    the ingest path down; it should reconnect and reload the full report.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, rows: list):
+        """Send changed standings rows to all subscribers."""
+        if not rows:
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(rows)
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+
+standings_events = Broadcaster()
+
+
+def standings_delta(rows: list, deleted_places: list = ()) -> list:
+    """Reduce stored driver rows to the fields pushed to subscribers.
+
+    Places that no longer exist are sent as {"place": place, "deleted": true}.
+    """
+    return ([{"place": row["place"],
+              "abbr": row["abbr"],
+              "name": row["name"],
+              "team": row["team"],
+              "best_lap": row["best_lap"]}
+             for row in rows]
+            + [{"place": place, "deleted": True} for place in sorted(deleted_places)])
@@ -0,0 +1,98 @@
+"""Batch ingestion of a directory of races.
+
+Usage: python ingest.py SEASON_DIR [--season 2018] [--session Race] [--workers 4]
+
+Every subdirectory of SEASON_DIR holding abbreviations.txt, start.log and end.log is
+one race named after the directory. Races are parsed in parallel worker processes and
+stored by the main process, which is the only database writer.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from race_report import parse_race
+from db_utils import add_race_to_db, DEFAULT_SESSION, INGEST_BATCH_SIZE
+from logger.logger import create_report_logger
+
+
+RACE_FILES = ("abbreviations.txt", "start.log", "end.log")
+
+logger = create_report_logger()
+
+
+def discover_races(season_dir: str) -> list:
+    """Return sorted (race name, race directory) pairs found in `season_dir`."""
+    races = []
+    for entry in sorted(os.scandir(season_dir), key=lambda entry: entry.name):
+        if entry.is_dir() and all(os.path.isfile(os.path.join(entry.path, name)) for name in RACE_FILES):
+            races.append((entry.name, entry.path))
+    return races
+
+
+def parse_race_dir(race_dir: str) -> tuple:
+    """Parse one race directory. Runs in a worker process.
+
+    Returns:
+        tuple: The report and the parsing time in seconds.
+    """
+    started = time.perf_counter()
+    report = parse_race(*(os.path.join(race_dir, name) for name in RACE_FILES))
+    return report, time.perf_counter() - started
+
+
+def ingest_season(season_dir: str, season: int = None, session_name: str = DEFAULT_SESSION,
+                  workers: int = None, batch_size: int = INGEST_BATCH_SIZE, progress=print) -> dict:
+    """Parse every race of `season_dir` in parallel and store the results.
+
+    Returns:
+        dict: Race names mapped to their load summary with "parse_time" and "store_time",
+              or to {"error": message} if the race could not be ingested.
+    """
+    races = discover_races(season_dir)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(parse_race_dir, race_dir): race_name for race_name, race_dir in races}
+        for done, future in enumerate(as_completed(futures), 1):
+            race_name = futures[future]
+            try:
+                report, parse_time = future.result()
+                started = time.perf_counter()
+                summary = add_race_to_db(report, race_name, session_name, season, batch_size)
+                store_time = time.perf_counter() - started
+            except Exception as error:
+                error_text = f"Failed to ingest race {race_name} - {error}"
+                logger.error(error_text)
+                results[race_name] = {"error": str(error)}
+                progress(f"[{done}/{len(races)}] {race_name}: {error_text}")
+                continue
+            results[race_name] = dict(summary, parse_time=parse_time, store_time=store_time)
+            progress(f"[{done}/{len(races)}] {race_name}: parsed in {parse_time:.3f} s, "
+                     f"stored in {store_time:.3f} s ({summary['inserted']} inserted, "
+                     f"{summary['updated']} updated, {summary['skipped']} skipped, "
+                     f"{summary['deleted']} deleted)")
+    return results
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("season_dir")
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--session", default=DEFAULT_SESSION)
+    parser.add_argument("--workers", type=int, help="Worker processes, defaults to the number of CPUs")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = ingest_season(args.season_dir, args.season, args.session, args.workers, args.batch_size)
+    failed = [race_name for race_name, result in results.items() if "error" in result]
+    print(f"Ingested {len(results) - len(failed)} of {len(results)} races in {time.perf_counter() - started:.3f} s")
+    if failed:
+        raise SystemExit(f"Failed races: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Follow growing start/end logs of a live session and keep the standings up to date.
+
+Usage: python live.py [--interval 1.0]
+
+The abbreviations, start and end log paths are taken from the environment
+(ABBREVIATIONS_PATH, STARTLOG_PATH, ENDLOG_PATH).
+"""
+import argparse
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from race_report import abbr_decoder, LapTracker, Leaderboard, parse_timestamp_ms
+from race_report.parser import ABBR_LENGTH
+from db_utils import migrate_db, update_standings
+from logger.logger import create_report_logger
+
+
+logger = create_report_logger()
+
+
+class LogTail:
+    """Remembers a file offset and reads only the complete lines appended since."""
+
+    def __init__(self, path_to_file: str):
+        self.path_to_file = path_to_file
+        self.offset = 0
+
+    def read_new_records(self) -> list:
+        """Return (abbreviation, epoch milliseconds) pairs of newly appended lines.
+
+        A trailing line without a line break is left for the next call. If the file
+        shrank, it is assumed to be replaced and is read again from the start.
+        Malformed lines are logged and skipped.
+        """
+        try:
+            with open(self.path_to_file, "rb") as file:
+                if os.fstat(file.fileno()).st_size < self.offset:
+                    logger.warning(f"{self.path_to_file} was truncated, reading it from the start")
+                    self.offset = 0
+                file.seek(self.offset)
+                data = file.read()
+        except FileNotFoundError:
+            return []
+
+        complete, line_break, _ = data.rpartition(b"\n")
+        if not line_break:
+            return []
+        records = []
+        for line in complete.split(b"\n"):
+            record = line.strip()
+            if not record:
+                continue
+            try:
+                records.append((record[:ABBR_LENGTH].decode("ascii"), parse_timestamp_ms(record)))
+            except (ValueError, UnicodeDecodeError) as error:
+                logger.warning(f"Invalid record in {self.path_to_file}: {record!r} - {error}. The line is skipped.")
+        self.offset += len(complete) + 1
+        return records
+
+
+class LiveIngestor:
+    """Incrementally pairs new start/end events and stores the changed standings."""
+
+    def __init__(self, abbreviations_path: str, startlog_path: str, endlog_path: str):
+        self.drivers_info = abbr_decoder(abbreviations_path)
+        self.tracker = LapTracker()
+        self.leaderboard = Leaderboard()
+        self.start_tail = LogTail(startlog_path)
+        self.end_tail = LogTail(endlog_path)
+        migrate_db()
+
+    def poll(self) -> set:
+        """Parse newly appended lines and store the places changed by new best laps.
+
+        Returns:
+            set: Abbreviations of the drivers whose best lap changed.
+        """
+        changed_drivers = set()
+        for driver_abbr, timestamp_ms in self.start_tail.read_new_records():
+            self._add_event(self.tracker.add_start, driver_abbr, timestamp_ms, changed_drivers)
+        for driver_abbr, timestamp_ms in self.end_tail.read_new_records():
+            self._add_event(self.tracker.add_end, driver_abbr, timestamp_ms, changed_drivers)
+
+        changed_places = []
+        for driver_abbr in changed_drivers:
+            changed_range = self.leaderboard.update(driver_abbr, self.tracker.stats[driver_abbr].best_ms)
+            if changed_range:
+                changed_places.append(changed_range)
+        if changed_places:
+            self.store(changed_places)
+        return changed_drivers
+
+    def _add_event(self, add_event, driver_abbr: str, timestamp_ms: int, changed_drivers: set):
+        stats = self.tracker.stats.get(driver_abbr)
+        best_ms = stats.best_ms if stats else None
+        lap_ms = add_event(driver_abbr, timestamp_ms)
+        if lap_ms is None or (best_ms is not None and lap_ms >= best_ms):
+            return
+        if driver_abbr not in self.drivers_info:
+            logger.warning(f"Unknown driver {driver_abbr}. The lap is not added to the standings.")
+            return
+        changed_drivers.add(driver_abbr)
+
+    def store(self, changed_places: list) -> list:
+        """Rewrite the rows of the changed (first place, last place) ranges in one transaction."""
+        entries = []
+        last_stored = 0
+        for first_place, last_place in sorted(changed_places):
+            first_place = max(first_place, last_stored + 1)
+            if first_place <= last_place:
+                entries.extend(self.leaderboard.entries(first_place, last_place))
+                last_stored = last_place
+        return update_standings(entries, self.drivers_info, len(self.leaderboard))
+
+
+def follow_in_background(ingestor: LiveIngestor, interval: float = 1.0) -> threading.Thread:
+    """Poll `ingestor` every `interval` seconds in a daemon thread of the current process.
+
+    Running the follower inside the web process lets it push deltas to the
+    /api/v1/report/stream subscribers.
+    """
+    def follow():
+        while True:
+            try:
+                ingestor.poll()
+            except Exception as error:
+                logger.error(f"Live ingestion failed - {error}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=follow, name="live-follow", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls")
+    args = parser.parse_args()
+
+    ingestor = LiveIngestor(os.getenv("ABBREVIATIONS_PATH"), os.getenv("STARTLOG_PATH"), os.getenv("ENDLOG_PATH"))
+    while True:
+        try:
+            changed_drivers = ingestor.poll()
+        except Exception as error:
+            logger.error(f"Live ingestion failed - {error}")
+        else:
+            if changed_drivers:
+                logger.info(f"Standings updated for {', '.join(sorted(changed_drivers))}")
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
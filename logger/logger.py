@@ -1,4 +1,107 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+from dotenv import load_dotenv
+
+
+load_dotenv()
+LOG_PATH = os.getenv("LOG_PATH", "logger/report.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_ASYNC = os.getenv("LOG_ASYNC", "1") == "1"
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 2**20))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s", "%Y-%m-%d %H:%M:%S"
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+                 "level": record.levelname,
+                 "file": record.filename,
+                 "line": record.lineno,
+                 "message": record.getMessage()}
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ReportQueueHandler(QueueHandler):
+    """QueueHandler that leaves the formatting of records to the listener thread.
+
+    Only the message arguments and the traceback are resolved in the logging thread,
+    as they may change once the call returns.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def create_file_handler(path_to_logger: str = LOG_PATH, rotation: str = LOG_ROTATION,
+                        log_format: str = LOG_FORMAT) -> logging.Handler:
+    """Create the handler writing the log file.
+
+    Args:
+        path_to_logger (str): Path to the log file.
+        rotation (str): "size" to rotate after LOG_MAX_BYTES, "time" to rotate at
+                        LOG_ROTATE_WHEN, anything else to never rotate.
+        log_format (str): "json" for one JSON object per line, "text" otherwise.
+    """
+    if rotation == "size":
+        handler = RotatingFileHandler(path_to_logger, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+    elif rotation == "time":
+        handler = TimedRotatingFileHandler(path_to_logger, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT)
+    else:
+        handler = logging.FileHandler(path_to_logger)
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(*TEXT_FORMAT))
+    return handler
+
+
+def create_queue_handler(handler: logging.Handler) -> tuple:
+    """Move the work of `handler` to a background thread.
+
+    The returned QueueHandler only puts records on an unbounded queue, so logging
+    never waits for the disk. Stopping the listener writes the records still queued.
+
+    Returns:
+        tuple: The QueueHandler to attach and the started QueueListener.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return ReportQueueHandler(log_queue), listener
+
+
+def log_synchronously_after_fork(logger: logging.Logger, queue_handler: logging.Handler, handler: logging.Handler):
+    """Make forked child processes write the records of `logger` with `handler` directly.
+
+    A child, e.g. a ProcessPoolExecutor worker, inherits the QueueHandler but not the
+    listener thread, so its records would be queued and never written.
+    """
+    def use_handler():
+        logger.removeHandler(queue_handler)
+        logger.addHandler(handler)
+
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=use_handler)
 
 
 def create_report_logger():
@@ -6,16 +109,16 @@ def create_report_logger():
     if logger.hasHandlers():
         return logger
 
-    logger_format = "%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s", "%Y-%m-%d %H:%M:%S"
-    path_to_logger = "logger/report.log"
-
-    logger.setLevel(logging.INFO)
-
-    file_handler = logging.FileHandler(path_to_logger)
-    file_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(*logger_format)
+    logger.setLevel(LOG_LEVEL)
 
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler = create_file_handler()
+    file_handler.setLevel(LOG_LEVEL)
+    if LOG_ASYNC:
+        queue_handler, listener = create_queue_handler(file_handler)
+        atexit.register(listener.stop)
+        log_synchronously_after_fork(logger, queue_handler, file_handler)
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(file_handler)
 
     return logger
@@ -0,0 +1,195 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Histograms of route latency, per-request database queries and report stages are
+kept in memory and rendered by `render_metrics` for the /metrics endpoint.
+"""
+import cProfile
+import contextvars
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from dotenv import load_dotenv
+
+
+load_dotenv()
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logger/profiles")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Cumulative histogram with one series per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.label_names, label_values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._series.get(label_values, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, value in series:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+request_latency = Histogram("report_http_request_duration_seconds", "Latency of HTTP requests by route.",
+                            ("method", "route", "status"))
+request_queries = Histogram("report_http_request_db_queries", "Database queries executed per HTTP request.",
+                            ("method", "route"), QUERY_BUCKETS)
+stage_latency = Histogram("report_stage_duration_seconds", "Duration of report parsing, storing and "
+                          "serialization stages.", ("stage",))
+db_queries = Counter("report_db_queries_total", "Database queries executed.")
+METRICS = [request_latency, request_queries, stage_latency, db_queries]
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed_stage(stage: str):
+    """Decorate a function to record its duration in `stage_latency`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stage_latency.observe(time.perf_counter() - started, stage)
+        return wrapper
+    return decorator
+
+
+_request_queries = contextvars.ContextVar("request_queries", default=None)
+
+
+def _count_query():
+    db_queries.inc()
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def count_queries(database):
+    """Count the queries executed through `database`, in total and for the current request.
+
+    `execute_sql` of the database instance is wrapped, so nothing depends on the level
+    of the peewee logger. Safe to call more than once.
+    """
+    if getattr(database, "_counts_queries", False):
+        return
+    execute_sql = database.execute_sql
+
+    @wraps(execute_sql)
+    def counted_execute_sql(sql, params=None, *args, **kwargs):
+        _count_query()
+        return execute_sql(sql, params, *args, **kwargs)
+
+    database.execute_sql = counted_execute_sql
+    database._counts_queries = True
+
+
+def start_request_queries():
+    """Start counting the queries of the request served by this thread."""
+    _request_queries.set([0])
+
+
+def request_query_count() -> int:
+    counter = _request_queries.get()
+    return counter[0] if counter is not None else 0
+
+
+def start_profile():
+    """Return a running profiler for a PROFILE_SAMPLE_RATE share of calls, otherwise None."""
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def save_profile(profiler: cProfile.Profile, name: str) -> str:
+    """Stop `profiler` and dump its stats to PROFILE_DIR, for use with pstats or snakeviz."""
+    profiler.disable()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{time.time_ns()}-{os.getpid()}-{name}.prof")
+    profiler.dump_stats(path)
+    return path
@@ -1 +1,7 @@
-from .report import abbr_decoder, drivers_best_lap, build_report, read_race_data
+from .report import abbr_decoder, drivers_best_lap, build_report, read_race_data, parse_race
+from .parser import (drivers_best_lap_ms, read_race_data_ms, iter_race_records,
+                     parse_timestamp_ms, format_lap_ms, parse_lap_ms)
+from .laps import LapStats, LapTracker, compute_lap_stats, best_laps_from_stats
+from .vectorized import drivers_best_lap_vectorized, read_race_arrays, rank_laps, parse_records
+from .ranking import IndexableSkipList, Leaderboard
+from .results_file import RaceResults, write_results, read_results
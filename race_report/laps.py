@@ -0,0 +1,118 @@
+from collections import defaultdict, deque
+from itertools import zip_longest
+
+from logger.logger import create_report_logger
+from .parser import CHUNK_SIZE, iter_race_records, format_lap_ms
+
+
+logger = create_report_logger()
+
+
+class LapStats:
+    """Running lap statistics of a single driver."""
+
+    __slots__ = ("count", "total_ms", "best_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0
+        self.best_ms = None
+
+    def add(self, lap_ms: int) -> bool:
+        """Add a lap duration. Returns True if it is a new best lap."""
+        self.count += 1
+        self.total_ms += lap_ms
+        if self.best_ms is None or lap_ms < self.best_ms:
+            self.best_ms = lap_ms
+            return True
+        return False
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def serialize(self) -> dict:
+        return {
+            "count": self.count,
+            "best_ms": self.best_ms,
+            "mean_ms": self.mean_ms,
+        }
+
+
+class LapTracker:
+    """Pairs start and end events per driver into laps.
+
+    The k-th start of a driver is paired with its k-th end, whichever arrives first.
+    Only unmatched events are buffered, so when both logs are fed in time order the
+    memory used is O(drivers) no matter how many laps are recorded.
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(LapStats)
+        self._pending_starts = defaultdict(deque)
+        self._pending_ends = defaultdict(deque)
+
+    def add_start(self, driver_abbr: str, timestamp_ms: int):
+        """Register a start event. Returns the completed lap duration or None."""
+        ends = self._pending_ends.get(driver_abbr)
+        if ends:
+            return self._add_lap(driver_abbr, timestamp_ms, ends.popleft())
+        self._pending_starts[driver_abbr].append(timestamp_ms)
+        return None
+
+    def add_end(self, driver_abbr: str, timestamp_ms: int):
+        """Register an end event. Returns the completed lap duration or None."""
+        starts = self._pending_starts.get(driver_abbr)
+        if starts:
+            return self._add_lap(driver_abbr, starts.popleft(), timestamp_ms)
+        self._pending_ends[driver_abbr].append(timestamp_ms)
+        return None
+
+    def _add_lap(self, driver_abbr: str, start_ms: int, end_ms: int):
+        lap_ms = end_ms - start_ms
+        if lap_ms < 0:
+            warning_text = f"Invalid time for {driver_abbr}. The lap is not added to the overall rating."
+            logger.warning(warning_text)
+            return None
+        self.stats[driver_abbr].add(lap_ms)
+        return lap_ms
+
+    def unmatched(self) -> dict:
+        """Return the number of unpaired events per driver."""
+        result = {}
+        for pending in (self._pending_starts, self._pending_ends):
+            for driver_abbr, events in pending.items():
+                if events:
+                    result[driver_abbr] = result.get(driver_abbr, 0) + len(events)
+        return result
+
+
+def compute_lap_stats(path_to_start_file: str, path_to_end_file: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Compute lap statistics for every driver in a single pass over both logs.
+
+    Returns:
+        dict: Driver abbreviations mapped to `LapStats`.
+    """
+    tracker = LapTracker()
+    start_records = iter_race_records(path_to_start_file, chunk_size)
+    end_records = iter_race_records(path_to_end_file, chunk_size)
+    for start_record, end_record in zip_longest(start_records, end_records):
+        if start_record:
+            tracker.add_start(*start_record)
+        if end_record:
+            tracker.add_end(*end_record)
+
+    for driver_abbr, events in tracker.unmatched().items():
+        logger.warning(f"{events} unpaired start/end events for {driver_abbr}")
+    return dict(tracker.stats)
+
+
+def best_laps_from_stats(lap_stats: dict) -> dict:
+    """Convert lap statistics into the `drivers_best_lap` format accepted by `build_report`.
+
+    Returns:
+        dict: Driver abbreviations mapped to best lap strings, fastest first.
+    """
+    ranking = sorted((stats.best_ms, driver_abbr) for driver_abbr, stats in lap_stats.items()
+                     if stats.best_ms is not None)
+    return {driver_abbr: format_lap_ms(best_ms) for best_ms, driver_abbr in ranking}
@@ -0,0 +1,147 @@
+import operator
+
+from logger.logger import create_report_logger
+
+
+CHUNK_SIZE = 1024 * 1024
+RECORD_LENGTH = 26
+ABBR_LENGTH = 3
+ABBR_SLICE = slice(0, ABBR_LENGTH)
+SEPARATORS = ((7, ord("-")), (10, ord("-")), (13, ord("_")), (16, ord(":")), (19, ord(":")), (22, ord(".")))
+
+logger = create_report_logger()
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    """Return the number of days since 1970-01-01 for a proleptic Gregorian date."""
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_timestamp_ms(record: bytes) -> int:
+    """Convert a fixed-width "AAAYYYY-MM-DD_HH:MM:SS.fff" record to epoch milliseconds.
+
+    The layout is parsed by offsets, so no `datetime.strptime` call is made per line.
+    """
+    if len(record) != RECORD_LENGTH:
+        raise ValueError(f"Invalid record length {len(record)}, expected {RECORD_LENGTH}")
+    for position, separator in SEPARATORS:
+        if record[position] != separator:
+            raise ValueError(f"Invalid record {record!r}")
+    days = _days_from_civil(int(record[3:7]), int(record[8:10]), int(record[11:13]))
+    return (days * 86_400_000
+            + int(record[14:16]) * 3_600_000
+            + int(record[17:19]) * 60_000
+            + int(record[20:22]) * 1000
+            + int(record[23:26]))
+
+
+def format_lap_ms(lap_ms: int) -> str:
+    """Format a lap duration in milliseconds as "H:MM:SS.fff", e.g. "0:01:04.415"."""
+    seconds, millis = divmod(lap_ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def parse_lap_ms(lap: str) -> int:
+    """Convert a lap string in the "H:MM:SS.fff" format back to milliseconds."""
+    clock, _, millis = lap.partition(".")
+    hours, minutes, seconds = (int(part) for part in clock.split(":"))
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + int(millis.ljust(3, "0")[:3] or 0)
+
+
+def iter_log_chunks(path_to_file: str, chunk_size: int = CHUNK_SIZE):
+    """Stream a log as binary blocks of roughly `chunk_size` bytes holding whole lines.
+
+    Memory usage does not depend on the size of the log.
+    """
+    try:
+        with open(path_to_file, "rb") as file:
+            tail = b""
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                block, line_break, tail = (tail + chunk).rpartition(b"\n")
+                if line_break:
+                    yield block
+            if tail:
+                yield tail
+    except FileNotFoundError:
+        error_text = f"No such file or directory '{path_to_file}'"
+        logger.error(error_text)
+        raise FileNotFoundError(error_text)
+    except (PermissionError, IsADirectoryError, IOError) as error:
+        error_text = f"Failed to access or read the file - {error}"
+        logger.error(error_text)
+        raise OSError(error_text)
+
+
+def iter_log_lines(path_to_file: str, chunk_size: int = CHUNK_SIZE):
+    """Stream raw lines of a log in batches, one list of `bytes` per binary chunk.
+
+    Lines are not stripped and may be blank.
+    """
+    for block in iter_log_chunks(path_to_file, chunk_size):
+        yield block.split(b"\n")
+
+
+def iter_race_records(path_to_file: str, chunk_size: int = CHUNK_SIZE):
+    """Stream (abbreviation, epoch milliseconds) pairs from a start/end log.
+
+    Blank lines are skipped.
+    """
+    for lines in iter_log_lines(path_to_file, chunk_size):
+        for line in lines:
+            record = line.strip()
+            if record:
+                yield record[:ABBR_LENGTH].decode("ascii"), parse_timestamp_ms(record)
+
+
+def read_race_data_ms(path_to_file: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Streaming counterpart of `read_race_data` returning epoch milliseconds.
+
+    Like `read_race_data`, the last record of each driver wins, so only the surviving
+    record of every driver is parsed and memory is O(drivers).
+    """
+    latest_records = {}
+    for lines in iter_log_lines(path_to_file, chunk_size):
+        records = list(map(bytes.strip, lines))
+        latest_records.update(zip(map(operator.itemgetter(ABBR_SLICE), records), records))
+
+    drivers_lap_time = {}
+    for driver_abbr, record in latest_records.items():
+        if record:
+            drivers_lap_time[driver_abbr.decode("ascii")] = parse_timestamp_ms(record)
+    return drivers_lap_time
+
+
+def drivers_best_lap_ms(path_to_start_file: str, path_to_end_file: str) -> dict:
+    """Streaming counterpart of `drivers_best_lap`.
+
+    Returns:
+        dict: Driver abbreviations mapped to lap durations in milliseconds, fastest first.
+    """
+    start_data = read_race_data_ms(path_to_start_file)
+    end_data = read_race_data_ms(path_to_end_file)
+
+    drivers_lap_ms = {}
+    for driver_abbr, start_ms in start_data.items():
+        if driver_abbr not in end_data:
+            error_text = f"Can't find {driver_abbr} in end.log"
+            logger.error(error_text)
+            raise ValueError(error_text)
+
+        lap_ms = end_data[driver_abbr] - start_ms
+        if lap_ms < 0:
+            warning_text = f"Invalid time for {driver_abbr}. The result is not added to the overall rating."
+            logger.warning(warning_text)
+            continue
+        drivers_lap_ms[driver_abbr] = lap_ms
+
+    return dict(sorted(drivers_lap_ms.items(), key=lambda item: item[1]))
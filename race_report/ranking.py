@@ -0,0 +1,188 @@
+import random
+from math import log2
+
+
+MAX_LEVELS = 32
+
+
+class _Last:
+    """Sentinel key that sorts after every other key."""
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return self is other
+
+    def __gt__(self, other):
+        return self is not other
+
+    def __ge__(self, other):
+        return True
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, next_nodes: list, widths: list):
+        self.key = key
+        self.next = next_nodes
+        self.width = widths
+
+
+class IndexableSkipList:
+    """Sorted collection with O(log n) insert, remove, rank and index lookups.
+
+    Every link stores how many elements it skips, so positions can be computed while
+    searching. Keys must be unique and comparable with each other.
+    """
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+        self._tail = _Node(_Last(), [], [])
+        self._head = _Node(None, [self._tail] * MAX_LEVELS, [1] * MAX_LEVELS)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index: int):
+        return self._node_at(index).key
+
+    def _node_at(self, index: int) -> _Node:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("skip list index out of range")
+        node = self._head
+        position = index + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.width[level] <= position:
+                position -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def _random_level(self) -> int:
+        return min(MAX_LEVELS, 1 - int(log2(1.0 - self._random.random())))
+
+    def insert(self, key):
+        chain = [None] * MAX_LEVELS
+        steps_at_level = [0] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = self._random_level()
+        new_node = _Node(key, [None] * levels, [None] * levels)
+        steps = 0
+        for level in range(levels):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain = [None] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        if target is self._tail or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def index(self, key) -> int:
+        """Return the zero-based position of `key`."""
+        node = self._head
+        position = 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        if node.next[0] is self._tail or node.next[0].key != key:
+            raise KeyError(key)
+        return position
+
+    def islice(self, start: int, stop: int):
+        """Yield the keys from position `start` up to, not including, `stop`."""
+        stop = min(stop, self._size)
+        if start >= stop:
+            return
+        node = self._node_at(start)
+        for _ in range(stop - start):
+            yield node.key
+            node = node.next[0]
+
+    def __iter__(self):
+        return self.islice(0, self._size)
+
+
+class Leaderboard:
+    """Live ranking of drivers by lap time.
+
+    Ties are broken by abbreviation. Updates, place lookups and top-k queries cost
+    O(log n) (plus k for the returned entries) instead of a full re-sort.
+    """
+
+    def __init__(self, seed=None):
+        self._ranking = IndexableSkipList(seed)
+        self._laps = {}
+
+    def __len__(self):
+        return len(self._laps)
+
+    def __contains__(self, driver_abbr: str):
+        return driver_abbr in self._laps
+
+    def update(self, driver_abbr: str, lap_ms: int):
+        """Set the lap time of a driver.
+
+        Returns:
+            tuple: The first and last place whose driver or lap changed, or None if
+                   nothing changed.
+        """
+        old_lap_ms = self._laps.get(driver_abbr)
+        if old_lap_ms == lap_ms:
+            return None
+        if old_lap_ms is None:
+            old_place = len(self._laps) + 1
+        else:
+            old_place = self._ranking.index((old_lap_ms, driver_abbr)) + 1
+            self._ranking.remove((old_lap_ms, driver_abbr))
+        self._ranking.insert((lap_ms, driver_abbr))
+        self._laps[driver_abbr] = lap_ms
+        new_place = self._ranking.index((lap_ms, driver_abbr)) + 1
+        return min(old_place, new_place), max(old_place, new_place)
+
+    def lap_ms(self, driver_abbr: str) -> int:
+        return self._laps[driver_abbr]
+
+    def place(self, driver_abbr: str) -> int:
+        """Return the 1-based place of a driver."""
+        return self._ranking.index((self._laps[driver_abbr], driver_abbr)) + 1
+
+    def entries(self, first_place: int, last_place: int) -> list:
+        """Return (place, abbreviation, lap ms) for the places in the inclusive range."""
+        keys = self._ranking.islice(first_place - 1, last_place)
+        return [(place, driver_abbr, lap_ms) for place, (lap_ms, driver_abbr) in enumerate(keys, first_place)]
+
+    def top(self, count: int) -> list:
+        """Return (place, abbreviation, lap ms) of the `count` fastest drivers."""
+        return self.entries(1, count)
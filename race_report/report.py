@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 
 from logger.logger import create_report_logger
+from metrics import timed_stage
+from .parser import format_lap_ms
 
 
 TIME_FORMAT = "%Y-%m-%d_%H:%M:%S.%f"
@@ -8,6 +10,7 @@ TIME_FORMAT = "%Y-%m-%d_%H:%M:%S.%f"
 logger = create_report_logger()
 
 
+@timed_stage("abbr_decoder")
 def abbr_decoder(path_to_file: str) -> dict:
     """Decrypts abbreviations from a file.
 
@@ -45,6 +48,7 @@ def abbr_decoder(path_to_file: str) -> dict:
         raise Exception(error_text)
 
 
+@timed_stage("read_race_data")
 def read_race_data(path_to_file: str) -> dict:
     """Reads the race data from the specified file.
 
@@ -84,6 +88,7 @@ def read_race_data(path_to_file: str) -> dict:
         raise Exception(error_text)
 
 
+@timed_stage("drivers_best_lap")
 def drivers_best_lap(path_to_start_file: str, path_to_end_file: str) -> dict:
     """Retrieve the drivers with the best lap times.
 
@@ -113,12 +118,13 @@ def drivers_best_lap(path_to_start_file: str, path_to_end_file: str) -> dict:
             logger.warning(warning_text)
             continue
 
-        drivers_best_lap[driver_abbr] = str(result)[:-3]
+        drivers_best_lap[driver_abbr] = format_lap_ms(result // timedelta(milliseconds=1))
 
     drivers_best_lap = dict(sorted(drivers_best_lap.items(), key=lambda item: item[1]))
     return drivers_best_lap
 
 
+@timed_stage("build_report")
 def build_report(drivers_abbr: dict, drivers_best_lap: dict) -> dict:
     """Builds a report of the drivers with their team and best lap time.
 
@@ -149,3 +155,10 @@ def build_report(drivers_abbr: dict, drivers_best_lap: dict) -> dict:
         error_text = f"Invalid data at some driver abbreviation: {error}"
         logger.warning(error_text)
         raise KeyError(error_text)
+
+
+def parse_race(abbreviations_path: str, startlog_path: str, endlog_path: str) -> dict:
+    """Parse the abbreviations, start and end logs of one race into a `build_report` report."""
+    drivers_info = abbr_decoder(abbreviations_path)
+    drivers_lap = drivers_best_lap(startlog_path, endlog_path)
+    return build_report(drivers_info, drivers_lap)
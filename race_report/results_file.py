@@ -0,0 +1,165 @@
+"""Compact binary file format for parsed race results.
+
+A results file holds a `build_report` report so it can be loaded without parsing
+the text logs again. Its layout, with all integers little-endian:
+
+    header    magic b"MRRF", version, record size, record count, name count, team count
+    records   one fixed-width record per driver, in place order:
+              abbreviation (3 ASCII bytes), padding, name id (uint16),
+              team id (uint16), best lap in milliseconds (uint32)
+    names     string table: (count + 1) uint32 offsets, then the UTF-8 strings
+    teams     string table of the team names, in the same layout
+
+Names and teams are interned, so each distinct string is stored once. The place of
+a driver is the position of their record. `RaceResults` reads the file through a
+memory map, decoding only the records and strings that are accessed.
+"""
+import mmap
+import os
+import struct
+
+from logger.logger import create_report_logger
+from .parser import ABBR_LENGTH, format_lap_ms, parse_lap_ms
+
+
+MAGIC = b"MRRF"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+RECORD = struct.Struct(f"<{ABBR_LENGTH}sxHHI")
+OFFSET = struct.Struct("<I")
+
+logger = create_report_logger()
+
+
+def _string_table(strings: list) -> bytes:
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+
+
+def write_results(report: dict, path_to_file: str):
+    """Write a `build_report` report to a results file.
+
+    The file is written next to its destination and moved into place, so readers
+    never see a partly written file.
+
+    Args:
+        report (dict): Drivers' names mapped to their team, best lap, place and abbreviation.
+        path_to_file (str): Path to the results file.
+    """
+    names, teams, records = {}, {}, []
+    for name, driver in sorted(report.items(), key=lambda item: item[1]["place"]):
+        name_id = names.setdefault(name, len(names))
+        team_id = teams.setdefault(driver["team"], len(teams))
+        records.append(RECORD.pack(driver["abbr"].encode("ascii"), name_id, team_id,
+                                   parse_lap_ms(driver["best_lap"])))
+
+    temporary_path = f"{path_to_file}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(records), len(names), len(teams)))
+        file.write(b"".join(records))
+        file.write(_string_table(list(names)))
+        file.write(_string_table(list(teams)))
+    os.replace(temporary_path, path_to_file)
+
+
+class RaceResults:
+    """Read-only view of a results file through a memory map.
+
+    Records and strings are decoded from the mapped file on access; nothing is
+    copied when the file is opened.
+    """
+
+    def __init__(self, path_to_file: str):
+        try:
+            with open(path_to_file, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            error_text = f"No such file or directory '{path_to_file}'"
+            logger.error(error_text)
+            raise FileNotFoundError(error_text)
+        except ValueError:
+            error_text = f"Results file '{path_to_file}' is empty"
+            logger.error(error_text)
+            raise ValueError(error_text)
+
+        self._buffer = memoryview(self._mmap)
+        try:
+            magic, version, record_size, self._count, name_count, team_count = HEADER.unpack_from(self._buffer)
+        except struct.error:
+            magic = version = record_size = None
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            error_text = f"'{path_to_file}' is not a version {VERSION} results file"
+            logger.error(error_text)
+            raise ValueError(error_text)
+
+        self._records_offset = HEADER.size
+        self._names_offset = self._records_offset + self._count * RECORD.size
+        self._teams_offset = self._names_offset + (name_count + 1) * OFFSET.size + self._table_size(
+            self._names_offset, name_count)
+        self._name_count = name_count
+        self._team_count = team_count
+
+    def _table_size(self, table_offset: int, count: int) -> int:
+        return OFFSET.unpack_from(self._buffer, table_offset + count * OFFSET.size)[0]
+
+    def _string(self, table_offset: int, count: int, index: int) -> str:
+        start, end = struct.unpack_from("<2I", self._buffer, table_offset + index * OFFSET.size)
+        strings_offset = table_offset + (count + 1) * OFFSET.size
+        return str(self._buffer[strings_offset + start:strings_offset + end], "utf-8")
+
+    def name(self, name_id: int) -> str:
+        return self._string(self._names_offset, self._name_count, name_id)
+
+    def team(self, team_id: int) -> str:
+        return self._string(self._teams_offset, self._team_count, team_id)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, index: int) -> tuple:
+        """Return the raw record at `index` as (abbr, name id, team id, lap ms)."""
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        abbr, name_id, team_id, lap_ms = RECORD.unpack_from(self._buffer, self._records_offset + index * RECORD.size)
+        return abbr.decode("ascii"), name_id, team_id, lap_ms
+
+    def __getitem__(self, index: int) -> dict:
+        """Return the driver at `index`, 0 being the first place, as a report row."""
+        abbr, name_id, team_id, lap_ms = self.record(index)
+        return {"name": self.name(name_id),
+                "team": self.team(team_id),
+                "best_lap": format_lap_ms(lap_ms),
+                "place": index + 1,
+                "abbr": abbr}
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def to_report(self) -> dict:
+        """Rebuild the `build_report` report stored in the file."""
+        report = {}
+        for driver in self:
+            name = driver.pop("name")
+            report[name] = driver
+        return report
+
+    def close(self):
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_results(path_to_file: str) -> dict:
+    """Load the `build_report` report stored in a results file."""
+    with RaceResults(path_to_file) as results:
+        return results.to_report()
@@ -0,0 +1,162 @@
+"""Optional NumPy backend for lap computation and ranking.
+
+Install NumPy to use it; the rest of the package does not depend on it. NumPy is
+imported on first use, so importing the package stays fast.
+"""
+from logger.logger import create_report_logger
+from .parser import CHUNK_SIZE, RECORD_LENGTH, SEPARATORS, iter_log_chunks, format_lap_ms
+
+
+np = None
+
+
+MS_PER_DAY = 86_400_000
+DIGIT_COLUMNS = [position for position in range(3, RECORD_LENGTH)
+                 if position not in dict(SEPARATORS)]
+
+logger = create_report_logger()
+
+
+def _require_numpy():
+    global np
+    if np is not None:
+        return
+    try:
+        import numpy
+    except ImportError:
+        error_text = "NumPy is required for the vectorized backend"
+        logger.error(error_text)
+        raise ImportError(error_text)
+    np = numpy
+
+
+def _days_from_civil(year, month, day):
+    """Vectorized version of `parser._days_from_civil`."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_records(data: bytes) -> tuple:
+    """Parse a block of log lines into abbreviation and epoch millisecond arrays.
+
+    Returns:
+        tuple: A `S3` array of abbreviations and an `int64` array of timestamps.
+    """
+    _require_numpy()
+    records = data.split()
+    if not records:
+        return np.empty(0, dtype="S3"), np.empty(0, dtype=np.int64)
+    data = b"".join(records)
+    if len(data) != len(records) * RECORD_LENGTH:
+        raise ValueError(f"Invalid record length, expected {RECORD_LENGTH}")
+
+    table = np.frombuffer(data, dtype=np.uint8).reshape(-1, RECORD_LENGTH)
+    for position, separator in SEPARATORS:
+        if not (table[:, position] == separator).all():
+            raise ValueError(f"Invalid separator at position {position}")
+    digits = table[:, DIGIT_COLUMNS] - np.uint8(ord("0"))
+    if (digits > 9).any():
+        raise ValueError("Invalid digit in timestamp")
+
+    def number(start, end):
+        value = np.zeros(len(digits), dtype=np.int64)
+        for position in range(DIGIT_COLUMNS.index(start), DIGIT_COLUMNS.index(end - 1) + 1):
+            value *= 10
+            value += digits[:, position]
+        return value
+
+    days = _days_from_civil(number(3, 7), number(8, 10), number(11, 13))
+    timestamps = (days * MS_PER_DAY + number(14, 16) * 3_600_000 + number(17, 19) * 60_000
+                  + number(20, 22) * 1000 + number(23, 26))
+    abbrs = table[:, :3].copy().view("S3").ravel()
+    return abbrs, timestamps
+
+
+def _last_per_driver(abbrs, timestamps, first_seen) -> tuple:
+    """Keep the last timestamp of every driver, like `read_race_data` does.
+
+    `first_seen` holds the record index of every row; the smallest one of each driver
+    is kept, which gives the order of first appearance used by `drivers_best_lap`.
+    Abbreviations are packed into integers first, as sorting integers is much
+    cheaper than sorting byte strings.
+    """
+    letters = np.frombuffer(abbrs.tobytes(), dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+    codes = (letters[:, 0] << 16) | (letters[:, 1] << 8) | letters[:, 2]
+    _, first_index = np.unique(codes, return_index=True)
+    _, reversed_index = np.unique(codes[::-1], return_index=True)
+    last_index = len(abbrs) - 1 - reversed_index
+    return abbrs[last_index], timestamps[last_index], first_seen[first_index]
+
+
+def read_race_arrays(path_to_file: str, chunk_size: int = CHUNK_SIZE, with_first_seen: bool = False) -> tuple:
+    """Read a start/end log into sorted unique abbreviations and their last timestamps.
+
+    With `with_first_seen`, a third array holds the index of the first record of
+    every driver in the log.
+    """
+    _require_numpy()
+    abbr_chunks, timestamp_chunks, first_seen_chunks = [], [], []
+    records = 0
+    for block in iter_log_chunks(path_to_file, chunk_size):
+        abbrs, timestamps = parse_records(block)
+        first_seen = np.arange(records, records + len(abbrs))
+        records += len(abbrs)
+        abbrs, timestamps, first_seen = _last_per_driver(abbrs, timestamps, first_seen)
+        abbr_chunks.append(abbrs)
+        timestamp_chunks.append(timestamps)
+        first_seen_chunks.append(first_seen)
+    if not abbr_chunks:
+        arrays = np.empty(0, dtype="S3"), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    else:
+        arrays = _last_per_driver(np.concatenate(abbr_chunks), np.concatenate(timestamp_chunks),
+                                  np.concatenate(first_seen_chunks))
+    return arrays if with_first_seen else arrays[:2]
+
+
+def rank_laps(start_abbrs, start_ms, end_abbrs, end_ms, start_first_seen=None) -> tuple:
+    """Compute and rank lap durations.
+
+    Both inputs must hold sorted unique abbreviations, as returned by `read_race_arrays`.
+    Negative laps are dropped with a warning. Equal laps keep the order of first
+    appearance in the start log if `start_first_seen` is given, like `drivers_best_lap`,
+    and the order of the abbreviations otherwise.
+
+    Returns:
+        tuple: Abbreviations and lap durations in milliseconds, fastest first.
+    """
+    _require_numpy()
+    positions = np.searchsorted(end_abbrs, start_abbrs)
+    positions = np.minimum(positions, max(len(end_abbrs) - 1, 0))
+    found = (end_abbrs[positions] == start_abbrs) if len(end_abbrs) else np.zeros(len(start_abbrs), bool)
+    if not found.all():
+        driver_abbr = start_abbrs[~found][0].decode()
+        error_text = f"Can't find {driver_abbr} in end.log"
+        logger.error(error_text)
+        raise ValueError(error_text)
+
+    laps = end_ms[positions] - start_ms
+    negative = laps < 0
+    for driver_abbr in start_abbrs[negative]:
+        warning_text = f"Invalid time for {driver_abbr.decode()}. The result is not added to the overall rating."
+        logger.warning(warning_text)
+    abbrs, laps = start_abbrs[~negative], laps[~negative]
+    if start_first_seen is None:
+        order = np.argsort(laps, kind="stable")
+    else:
+        order = np.lexsort((start_first_seen[~negative], laps))
+    return abbrs[order], laps[order]
+
+
+def drivers_best_lap_vectorized(path_to_start_file: str, path_to_end_file: str) -> dict:
+    """Vectorized drop-in replacement for `drivers_best_lap`.
+
+    Returns:
+        dict: A dictionary with drivers' best lap times, fastest first.
+    """
+    start_abbrs, start_ms, start_first_seen = read_race_arrays(path_to_start_file, with_first_seen=True)
+    abbrs, laps = rank_laps(start_abbrs, start_ms, *read_race_arrays(path_to_end_file), start_first_seen)
+    return {driver_abbr.decode(): format_lap_ms(int(lap_ms)) for driver_abbr, lap_ms in zip(abbrs, laps)}
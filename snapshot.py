@@ -0,0 +1,88 @@
+import threading
+from operator import itemgetter
+from types import MappingProxyType
+
+from models import DriverModel
+from cache import current_generation
+
+
+SNAPSHOT_FIELDS = ("name", "place", "team", "best_lap", "abbr")
+
+
+class ReportSnapshot:
+    """Immutable in-memory copy of the drivers table with pre-sorted views.
+
+    Views are tuples of dicts and must not be modified; a new snapshot is built
+    instead whenever the data changes.
+    """
+
+    __slots__ = ("generation", "by_place", "by_place_desc", "by_name", "by_name_desc", "by_abbr")
+
+    def __init__(self, drivers: list, generation: int = 0):
+        self.generation = generation
+        self.by_place = tuple(sorted(drivers, key=itemgetter("place")))
+        self.by_place_desc = self.by_place[::-1]
+        self.by_name = tuple(sorted(drivers, key=itemgetter("name")))
+        self.by_name_desc = self.by_name[::-1]
+        self.by_abbr = MappingProxyType({driver["abbr"]: driver for driver in drivers})
+
+    def __len__(self):
+        return len(self.by_place)
+
+
+def load_snapshot(generation: int = 0) -> ReportSnapshot:
+    """Read the drivers table into a new `ReportSnapshot`."""
+    fields = [getattr(DriverModel, name) for name in SNAPSHOT_FIELDS]
+    return ReportSnapshot(list(DriverModel.select(*fields).dicts()), generation)
+
+
+class SnapshotStore:
+    """Holds the current `ReportSnapshot` of the drivers table.
+
+    Readers take the current snapshot without locking. The ingest path builds a new
+    snapshot after every write and swaps the reference in one assignment, so a
+    request always sees one consistent version. The database remains the source of
+    truth: a snapshot older than the data generation stored in it is rebuilt, which
+    picks up writes made by other processes within DATA_VERSION_TTL seconds.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ReportSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.generation != current_generation():
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.generation != current_generation():
+                    snapshot = self._build()
+        return snapshot
+
+    def refresh(self) -> ReportSnapshot:
+        """Rebuild the snapshot from the database and swap it in."""
+        with self._lock:
+            return self._build()
+
+    def _build(self) -> ReportSnapshot:
+        snapshot = load_snapshot(current_generation())
+        self._snapshot = snapshot
+        return snapshot
+
+    def clear(self):
+        self._snapshot = None
+
+
+report_snapshot = SnapshotStore()
+
+
+def query_snapshot(rows: tuple, fields: tuple, team: str = None, after_place: int = None,
+                   limit: int = None, offset: int = None) -> list:
+    """Filter, paginate and project snapshot rows like the report API query arguments do."""
+    if team:
+        rows = [row for row in rows if row["team"] == team]
+    if after_place is not None:
+        rows = [row for row in rows if row["place"] > after_place]
+    start = offset or 0
+    rows = rows[start:start + limit] if limit is not None else rows[start:]
+    return [{field: row[field] for field in fields} for row in rows]
@@ -1,10 +1,64 @@
+import os
+from unittest.mock import patch
+
 import pytest
 
 from app import app
+from models import (create_database_from_url, DriverModel, RaceModel, SessionModel, ResultModel, InputFileModel,
+                    DataVersionModel)
+from cache import response_cache, page_cache, version_tracker
+from snapshot import report_snapshot
+
+
+MODELS = [DriverModel, RaceModel, SessionModel, ResultModel, InputFileModel, DataVersionModel]
 
 
 @pytest.fixture
 def client():
+    response_cache.clear()
+    page_cache.clear()
+    report_snapshot.clear()
+    version_tracker.clear()
     with app.app_context():
         with app.test_client() as client:
             yield client
+
+
+@pytest.fixture
+def test_db():
+    """An in-memory SQLite stand-in for the configured database.
+
+    The connection is held open for the whole test, as an in-memory database only
+    lives as long as its connection.
+    """
+    database = create_database_from_url("sqlite:///:memory:")
+    database.connect()
+    version_tracker.clear()
+    with database.bind_ctx(MODELS), patch("db_utils.db", database):
+        yield database
+    report_snapshot.clear()
+    version_tracker.clear()
+    database.close()
+
+
+@pytest.fixture
+def postgres_db():
+    """A PostgreSQL database from TEST_DATABASE_URL, e.g. a local throwaway server.
+
+    The tables of the report are dropped before and after the test, so the URL must
+    point to a database used only for testing.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    pytest.importorskip("psycopg2")
+    database = create_database_from_url(url)
+    database.connect()
+    version_tracker.clear()
+    with database.bind_ctx(MODELS), patch("db_utils.db", database):
+        database.drop_tables(MODELS)
+        yield database
+        database.drop_tables(MODELS)
+    report_snapshot.clear()
+    version_tracker.clear()
+    database.close()
@@ -13,3 +13,11 @@ param_for_drivers_best_lap = {"SVF": "0:01:04.415",
                               "KRF": "0:01:12.434",
                               "VBM": "0:01:12.618",
                               }
+
+param_for_report = {"Sebastian Vettel":
+                    {"team": "FERRARI", "best_lap": "0:01:04.415", "place": 1, "abbr": "SVF"},
+                    "Kimi Raikkonen":
+                    {"team": "FERRARI", "best_lap": "0:01:12.434", "place": 2, "abbr": "KRF"},
+                    "Valtteri Bottas":
+                    {"team": "MERCEDES", "best_lap": "0:01:12.618", "place": 3, "abbr": "VBM"},
+                    }
@@ -6,7 +6,9 @@ from bs4 import BeautifulSoup
 from peewee import PeeweeException, DatabaseError
 
 from app import app
-from models import DriverModel
+from db_utils import add_race_to_db
+from models import db, DriverModel
+from .param_data import param_for_report
 
 
 app.config["SERVER_NAME"] = "localhost"
@@ -154,15 +156,13 @@ def test_report_api_xml(client):
     response = client.get(url_for("report_api", format="xml"))
     
     driver = DriverModel.select().where(DriverModel.place == 1).first()    
-    text = response.text.strip()
-    driver_xml = f"<root>{text}</root>"
-    root = ET.fromstring(driver_xml)
+    root = ET.fromstring(response.data)
     
-    response_name = root.find("name").text
-    response_abbr = root.find("abbr").text
-    response_team = root.find("team").text
-    response_place = int(root.find("place").text)
-    response_best_lap = root.find("best_lap").text
+    response_name = root.find("driver/name").text
+    response_abbr = root.find("driver/abbr").text
+    response_team = root.find("driver/team").text
+    response_place = int(root.find("driver/place").text)
+    response_best_lap = root.find("driver/best_lap").text
     
     assert driver.name == response_name
     assert driver.abbr == response_abbr
@@ -197,12 +197,10 @@ def test_report_drivers_api_xml(client):
     response = client.get(url_for("report_drivers_api", format="xml"))
     
     driver = DriverModel.select().order_by(DriverModel.name).first()
-    text = response.text.strip()
-    driver_xml = f"<root>{text}</root>"
-    root = ET.fromstring(driver_xml)
+    root = ET.fromstring(response.data)
     
-    responce_name = root.find("name").text
-    response_team = root.find("team").text
+    responce_name = root.find("driver/name").text
+    response_team = root.find("driver/team").text
 
     assert driver.name == responce_name
     assert driver.team == response_team
@@ -230,9 +228,7 @@ def test_report_driver_api_valid_xml(client):
     driver = DriverModel.select().first()
     response = client.get(url_for("report_driver_api", driver_abbr=driver.abbr, format="xml"))
     
-    text = response.text.strip()
-    driver_xml = f"<root>{text}</root>"
-    root = ET.fromstring(driver_xml)
+    root = ET.fromstring(response.data)
     
     responce_name = root.find("name").text
     response_team = root.find("team").text
@@ -254,3 +250,102 @@ def test_report_driver_api_exception(client):
         response = client.get(url_for("report_driver_api", driver_abbr="SVF"))
         
         assert response.status_code == 500
+
+
+def test_report_api_limit_offset(client):
+    response = client.get(url_for("report_api", format="json", limit=2, offset=1))
+    places = [driver["place"] for driver in response.get_json()]
+
+    assert response.status_code == 200
+    assert places == [2, 3]
+
+
+def test_report_api_after_place(client):
+    response = client.get(url_for("report_api", format="json", after_place=2, limit=1))
+
+    assert [driver["place"] for driver in response.get_json()] == [3]
+
+
+def test_report_api_fields(client):
+    response = client.get(url_for("report_api", format="json", fields="name,best_lap"))
+    driver = DriverModel.select().where(DriverModel.place == 1).first()
+
+    assert response.get_json()[0] == {"name": driver.name, "best_lap": driver.best_lap}
+
+
+def test_report_drivers_api_team(client):
+    response = client.get(url_for("report_drivers_api", format="json", team="FERRARI"))
+    expected_names = [driver.name for driver in
+                      DriverModel.select().where(DriverModel.team == "FERRARI").order_by(DriverModel.name)]
+
+    assert [driver["name"] for driver in response.get_json()] == expected_names
+
+
+def test_report_api_invalid_params(client):
+    assert client.get(url_for("report_api", format="json", limit="ten")).status_code == 400
+    assert client.get(url_for("report_api", format="json", offset=-1)).status_code == 400
+    assert client.get(url_for("report_api", format="json", limit="\u00b2")).status_code == 400
+    assert client.get(url_for("report_drivers_api", format="json", fields="name,salary")).status_code == 400
+
+
+def test_report_api_stream_json(client):
+    expected = client.get(url_for("report_api", format="json")).get_json()
+    response = client.get(url_for("report_api", format="json", stream="true"))
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.get_json() == expected
+
+
+def test_report_drivers_api_stream_xml(client):
+    response = client.get(url_for("report_drivers_api", format="xml", stream="1", limit=2))
+    root = ET.fromstring(response.data)
+
+    drivers = DriverModel.select().order_by(DriverModel.name).limit(2)
+    assert root.tag == "drivers"
+    assert [element.text for element in root.findall("driver/name")] == [driver.name for driver in drivers]
+
+
+def test_report_api_stream_invalid_format(client):
+    response = client.get(url_for("report_api", format="yaml", stream="true"))
+
+    assert response.status_code == 400
+
+
+def test_races_api(test_db, client):
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix", season=2018)
+
+    response = client.get(url_for("races_api", format="json"))
+
+    assert response.get_json() == [{"id": 1, "name": "Monaco Grand Prix", "season": 2018, "session": "Race"}]
+
+
+def test_race_report_api(test_db, client):
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix")
+    add_race_to_db({"Valtteri Bottas": dict(param_for_report["Valtteri Bottas"], place=1)},
+                   race_name="Monaco Grand Prix", session_name="Practice 1")
+
+    race_response = client.get(url_for("race_report_api", race_id=1, format="json", fields="abbr"))
+    practice_response = client.get(url_for("race_report_api", race_id=1, session="Practice 1", format="xml"))
+
+    assert race_response.get_json() == [{"abbr": "SVF"}, {"abbr": "KRF"}, {"abbr": "VBM"}]
+    assert ET.fromstring(practice_response.data).find("driver/abbr").text == "VBM"
+
+
+def test_race_report_api_not_found(test_db, client):
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix")
+
+    assert client.get(url_for("race_report_api", race_id=2, format="json")).status_code == 404
+    assert client.get(url_for("race_report_api", race_id=1, session="Q3", format="json")).status_code == 404
+
+
+def test_request_closes_db_connection(client):
+    client.get(url_for("race_report_api", race_id=1, format="json"))
+
+    assert db.is_closed()
+
+
+def test_api_docs(client):
+    response = client.get("/apispec_1.json")
+    assert response.status_code == 200
+    assert "/report/" in response.json["paths"]
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app import app
+from asgi import ReportApplication
+
+
+def asgi_get(application, path: str, query: str = "") -> tuple:
+    """Send one GET request to an ASGI application and return its status, headers and body."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query.encode()}
+    asyncio.run(application(scope, receive, send))
+    headers = dict(messages[0]["headers"])
+    return messages[0]["status"], headers, messages[1]["body"]
+
+
+@pytest.mark.parametrize("path, query", [
+    ("/api/v1/report/", "format=json"),
+    ("/api/v1/report/", "format=xml"),
+    ("/api/v1/report/", "format=json&fields=abbr,best_lap&limit=3&offset=2"),
+    ("/api/v1/report/", "format=xml&after_place=5&team=FERRARI"),
+    ("/api/v1/report/drivers/", "format=json"),
+    ("/api/v1/report/drivers/", "format=xml&limit=4"),
+    ("/api/v1/report/drivers/SVF", "format=json"),
+    ("/api/v1/report/drivers/SVF", "format=xml"),
+])
+def test_asgi_matches_flask(path, query):
+    flask_response = app.test_client().get(f"{path}?{query}")
+
+    status, headers, body = asgi_get(ReportApplication(), path, query)
+
+    assert status == flask_response.status_code == 200
+    assert headers[b"content-type"].decode() == flask_response.mimetype
+    assert body == flask_response.data
+
+
+def test_asgi_errors():
+    application = ReportApplication()
+
+    assert asgi_get(application, "/api/v1/report/", "format=yaml")[0] == 400
+    assert asgi_get(application, "/api/v1/report/", "format=json&limit=x")[0] == 400
+    assert asgi_get(application, "/api/v1/report/", "format=json&limit=%C2%B2")[0] == 400
+    assert asgi_get(application, "/api/v1/report/drivers/TEST", "format=json")[0] == 404
+    assert asgi_get(application, "/report/")[0] == 404
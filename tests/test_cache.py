@@ -0,0 +1,218 @@
+import gzip
+import threading
+from unittest.mock import patch
+
+from flask import url_for
+
+from app import app, filter_snapshot
+from cache import ResponseCache, bump_generation, current_generation, version_tracker, data_transaction
+from db_utils import add_drivers_to_db
+from models import create_database_from_url, DataVersionModel, DriverModel
+from snapshot import report_snapshot
+from .param_data import param_for_report
+
+
+app.config["SERVER_NAME"] = "localhost"
+
+
+def test_response_cache_lru_eviction():
+    cache = ResponseCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_response_cache_generation_invalidation(test_db):
+    cache = ResponseCache()
+    cache.set("a", 1)
+
+    bump_generation()
+
+    assert cache.get("a") is None
+
+
+def test_cached_response_skips_query(client):
+    first_response = client.get(url_for("report_api", format="json"))
+    with patch("app.filter_snapshot") as mock:
+        second_response = client.get(url_for("report_api", format="json"))
+
+        mock.assert_not_called()
+    assert second_response.status_code == 200
+    assert second_response.data == first_response.data
+    assert second_response.content_type == first_response.content_type
+
+
+def test_cached_response_keyed_by_format(client):
+    json_response = client.get(url_for("report_api", format="json"))
+    xml_response = client.get(url_for("report_api", format="xml"))
+
+    assert json_response.data != xml_response.data
+
+
+def test_cached_response_errors_not_cached(client):
+    client.get(url_for("report_api", format="yaml"))
+    with patch("app.filter_snapshot", wraps=filter_snapshot) as mock:
+        client.get(url_for("report_api", format="yaml"))
+
+        mock.assert_called_once()
+
+
+def test_ingest_bumps_generation(test_db):
+    generation = current_generation()
+
+    add_drivers_to_db(param_for_report)
+    assert current_generation() == generation + 1
+
+    add_drivers_to_db(param_for_report)
+    assert current_generation() == generation + 1
+
+
+def test_conditional_response_etag(client):
+    response = client.get(url_for("report_api", format="json"))
+    etag = response.headers["ETag"]
+
+    with patch("app.filter_snapshot") as mock:
+        cached_response = client.get(url_for("report_api", format="json"), headers={"If-None-Match": etag})
+
+        mock.assert_not_called()
+    assert response.status_code == 200
+    assert cached_response.status_code == 304
+    assert cached_response.data == b""
+    assert cached_response.headers["ETag"] == etag
+
+
+def test_conditional_response_etag_per_url(client):
+    json_etag = client.get(url_for("report_api", format="json")).headers["ETag"]
+    xml_response = client.get(url_for("report_api", format="xml"), headers={"If-None-Match": json_etag})
+
+    assert xml_response.status_code == 200
+    assert xml_response.headers["ETag"] != json_etag
+
+
+def test_conditional_response_etag_changes_on_ingest(test_db, client):
+    add_drivers_to_db(param_for_report)
+    etag = client.get(url_for("report")).headers["ETag"]
+
+    bump_generation()
+    response = client.get(url_for("report"), headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_conditional_response_last_modified(client):
+    response = client.get(url_for("report_drivers"))
+    modified_response = client.get(url_for("report_drivers"),
+                                   headers={"If-Modified-Since": response.headers["Last-Modified"]})
+
+    assert modified_response.status_code == 304
+
+
+def test_conditional_response_not_found(client):
+    response = client.get(url_for("report_driver", driver_id="TEST"))
+
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+
+def test_precompressed_page_gzip(client):
+    response = client.get(url_for("report"))
+    gzip_response = client.get(url_for("report"), headers={"Accept-Encoding": "gzip"})
+
+    assert gzip_response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(gzip_response.data) == response.data
+    assert "Accept-Encoding" in gzip_response.headers["Vary"]
+    assert gzip_response.headers["ETag"] != response.headers["ETag"]
+
+
+def test_precompressed_page_etag_per_encoding(client):
+    etag = client.get(url_for("report_drivers"), headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+    gzip_response = client.get(url_for("report_drivers"), headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    identity_response = client.get(url_for("report_drivers"), headers={"If-None-Match": etag})
+
+    assert gzip_response.status_code == 304
+    assert identity_response.status_code == 200
+
+
+def test_precompressed_page_cached_per_order(test_db, client):
+    add_drivers_to_db(param_for_report)
+    asc_response = client.get(url_for("report"))
+    desc_response = client.get(url_for("report", order="desc"))
+    with patch("app.render_template") as mock:
+        cached_response = client.get(url_for("report", order="desc"))
+
+        mock.assert_not_called()
+    assert cached_response.data == desc_response.data != asc_response.data
+
+    bump_generation()
+    with patch("app.render_template", return_value="<html></html>") as mock:
+        client.get(url_for("report", order="desc"))
+
+        mock.assert_called_once()
+
+
+def test_generation_shared_through_database(test_db):
+    add_drivers_to_db(param_for_report)
+    cache = ResponseCache()
+    cache.set("a", 1)
+
+    DataVersionModel.update(version=DataVersionModel.version + 1).execute()
+    assert cache.get("a") == 1
+    with patch.object(version_tracker, "ttl", 0):
+        assert cache.get("a") is None
+
+
+def test_etag_derived_from_stored_version(test_db, client):
+    add_drivers_to_db(param_for_report)
+    response = client.get(url_for("report_api", format="json"))
+
+    version_tracker.clear()
+    restarted_response = client.get(url_for("report_api", format="json"))
+    assert restarted_response.headers["ETag"] == response.headers["ETag"]
+    assert restarted_response.last_modified == response.last_modified
+
+    DataVersionModel.update(version=DataVersionModel.version + 1).execute()
+    with patch.object(version_tracker, "ttl", 0):
+        stale_response = client.get(url_for("report_api", format="json"),
+                                    headers={"If-None-Match": response.headers["ETag"]})
+    assert stale_response.status_code == 200
+
+
+def test_generation_taken_over_after_commit(tmp_path):
+    database = create_database_from_url(f"sqlite:///{tmp_path / 'report.db'}")
+    bump = version_tracker.bump
+    bumped, committing = threading.Event(), threading.Event()
+
+    def bump_and_wait():
+        bump()
+        bumped.set()
+        committing.wait(5)
+
+    def rename_driver():
+        with database.connection_context(), data_transaction():
+            DriverModel.update(name="Seb Vettel").where(DriverModel.abbr == "SVF").execute()
+
+    version_tracker.clear()
+    with database.bind_ctx([DriverModel, DataVersionModel]), patch("db_utils.db", database), \
+            patch.object(version_tracker, "ttl", 60):
+        add_drivers_to_db(param_for_report)
+        with patch.object(version_tracker, "bump", bump_and_wait):
+            writer = threading.Thread(target=rename_driver)
+            writer.start()
+            bumped.wait(5)
+            with database.connection_context():
+                assert report_snapshot.get().by_abbr["SVF"]["name"] == "Sebastian Vettel"
+            committing.set()
+            writer.join()
+
+        with database.connection_context():
+            assert report_snapshot.get().by_abbr["SVF"]["name"] == "Seb Vettel"
+    report_snapshot.clear()
+    version_tracker.clear()
@@ -0,0 +1,188 @@
+from db_utils import (add_drivers_to_db, add_race_to_db, update_standings, migrate_db, check_input_files,
+                      store_input_files, _copy_rows)
+from race_report import parse_race
+from models import DriverModel, RaceModel, SessionModel, ResultModel
+from .param_data import param_for_report, param_for_abbr_decoder
+
+
+def test_add_drivers_to_db(test_db):
+    add_drivers_to_db(param_for_report)
+
+    drivers = list(DriverModel.select().order_by(DriverModel.best_lap_ms))
+
+    assert [driver.name for driver in drivers] == ["Sebastian Vettel", "Kimi Raikkonen", "Valtteri Bottas"]
+    assert [driver.best_lap_ms for driver in drivers] == [64415, 72434, 72618]
+
+
+def test_migrate_db_adds_best_lap_ms(test_db):
+    test_db.execute_sql("CREATE TABLE drivers (place INTEGER PRIMARY KEY, name VARCHAR(100), "
+                        "abbr VARCHAR(3), team VARCHAR(50), best_lap VARCHAR(20))")
+    test_db.execute_sql("INSERT INTO drivers VALUES (1, 'Sebastian Vettel', 'SVF', 'FERRARI', '0:01:04.415')")
+
+    migrate_db()
+
+    columns = {column.name for column in test_db.get_columns("drivers")}
+    indexes = {tuple(index.columns) for index in test_db.get_indexes("drivers")}
+    assert "best_lap_ms" in columns
+    assert ("best_lap_ms",) in indexes
+    assert DriverModel.get(DriverModel.place == 1).best_lap_ms == 64415
+
+
+def test_migrate_db_skips_legacy_best_lap(test_db):
+    test_db.execute_sql("CREATE TABLE drivers (place INTEGER PRIMARY KEY, name VARCHAR(100), "
+                        "abbr VARCHAR(3), team VARCHAR(50), best_lap VARCHAR(20))")
+    test_db.execute_sql("INSERT INTO drivers VALUES (1, 'Sebastian Vettel', 'SVF', 'FERRARI', '0:01:04.415'), "
+                        "(2, 'Kimi Raikkonen', 'KRF', 'FERRARI', '0:01')")
+
+    migrate_db()
+
+    assert [driver.best_lap_ms for driver in DriverModel.select()] == [64415, None]
+    add_drivers_to_db(param_for_report)
+    assert DriverModel.get(DriverModel.place == 2).best_lap_ms == 72434
+
+
+def test_select_with_gap(test_db):
+    add_drivers_to_db(param_for_report)
+
+    gaps = [driver.gap_ms for driver in DriverModel.select_with_gap().order_by(DriverModel.place)]
+
+    assert gaps == [0, 8019, 8203]
+
+
+def test_add_drivers_to_db_summary(test_db):
+    assert add_drivers_to_db(param_for_report) == {"inserted": 3, "updated": 0, "skipped": 0, "deleted": 0}
+    assert add_drivers_to_db(param_for_report, batch_size=1) == {"inserted": 0, "updated": 0, "skipped": 3,
+                                                                 "deleted": 0}
+
+
+def test_add_drivers_to_db_updates_changed_laps(test_db):
+    add_drivers_to_db(param_for_report)
+    report = {"Kimi Raikkonen": {"team": "FERRARI", "best_lap": "0:01:03.100", "place": 1, "abbr": "KRF"},
+              "Sebastian Vettel": {"team": "FERRARI", "best_lap": "0:01:04.415", "place": 2, "abbr": "SVF"},
+              "Valtteri Bottas": {"team": "MERCEDES", "best_lap": "0:01:12.618", "place": 3, "abbr": "VBM"},
+              "Lewis Hamilton": {"team": "MERCEDES", "best_lap": "0:01:13.000", "place": 4, "abbr": "LHM"}}
+
+    summary = add_drivers_to_db(report, batch_size=2)
+
+    drivers = DriverModel.select().order_by(DriverModel.place)
+    assert summary == {"inserted": 1, "updated": 2, "skipped": 1, "deleted": 0}
+    assert [(driver.abbr, driver.best_lap_ms) for driver in drivers] == [
+        ("KRF", 63100), ("SVF", 64415), ("VBM", 72618), ("LHM", 73000)]
+
+
+def test_add_drivers_to_db_deletes_missing_places(test_db):
+    add_drivers_to_db(param_for_report)
+    report = dict(list(param_for_report.items())[:2])
+
+    summary = add_drivers_to_db(report)
+
+    assert summary == {"inserted": 0, "updated": 0, "skipped": 2, "deleted": 1}
+    assert [driver.abbr for driver in DriverModel.select()] == ["SVF", "KRF"]
+
+
+def test_update_standings_deletes_places_beyond_total(test_db):
+    add_drivers_to_db(param_for_report)
+
+    update_standings([(1, "KRF", 60000), (2, "SVF", 64415)], param_for_abbr_decoder, total_places=2)
+
+    assert [(driver.place, driver.abbr) for driver in DriverModel.select()] == [(1, "KRF"), (2, "SVF")]
+
+
+def test_add_race_to_db(test_db):
+    summary = add_race_to_db(param_for_report, race_name="Monaco Grand Prix", season=2018)
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix", session_name="Practice 1", season=2018)
+
+    session = SessionModel.get(SessionModel.name == "Race")
+    results = ResultModel.select().where(ResultModel.session == session).order_by(ResultModel.place)
+    assert summary == {"inserted": 3, "updated": 0, "skipped": 0, "deleted": 0}
+    assert RaceModel.select().count() == 1
+    assert SessionModel.select().count() == 2
+    assert [result.abbr for result in results] == ["SVF", "KRF", "VBM"]
+    assert results[0].race_id == session.race_id
+
+
+def test_add_race_to_db_updates_session(test_db):
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix")
+    report = dict(param_for_report, **{"Kimi Raikkonen": dict(param_for_report["Kimi Raikkonen"],
+                                                              best_lap="0:01:11.000")})
+
+    summary = add_race_to_db(report, race_name="Monaco Grand Prix")
+
+    assert summary == {"inserted": 0, "updated": 1, "skipped": 2, "deleted": 0}
+    assert ResultModel.get(ResultModel.abbr == "KRF").best_lap_ms == 71000
+
+
+def test_add_race_to_db_deletes_missing_places(test_db):
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix")
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix", session_name="Practice 1")
+
+    summary = add_race_to_db(dict(list(param_for_report.items())[:2]), race_name="Monaco Grand Prix")
+
+    assert summary == {"inserted": 0, "updated": 0, "skipped": 2, "deleted": 1}
+    assert ResultModel.select().count() == 5
+
+
+def test_result_model_indexes(test_db):
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix")
+
+    indexes = {tuple(index.columns) for index in test_db.get_indexes("results")}
+
+    assert {("session_id", "place"), ("race_id", "place"), ("abbr", "race_id")} <= indexes
+
+
+def test_copy_rows():
+    rows = [{"place": 1, "name": "Kimi\tRaikkonen", "best_lap": None},
+            {"place": 2, "name": "C:\\new", "best_lap": "0:01:12.434"}]
+
+    buffer = _copy_rows(rows, ["place", "name", "best_lap"])
+
+    assert buffer.read() == "1\tKimi\\tRaikkonen\t\\N\n2\tC:\\\\new\t0:01:12.434\n"
+
+
+def test_add_drivers_to_db_reuses_open_connection(test_db):
+    add_drivers_to_db(param_for_report)
+
+    assert not test_db.is_closed()
+    assert DriverModel.select().count() == 3
+
+
+def test_check_input_files(test_db, tmp_path):
+    path = tmp_path / "abbreviations.txt"
+    path.write_text("SVF_Sebastian Vettel_FERRARI\n")
+
+    fingerprints, unchanged = check_input_files([str(path)])
+    assert not unchanged
+    store_input_files(fingerprints)
+    add_drivers_to_db(param_for_report)
+    assert check_input_files([str(path)])[1]
+
+    path.write_text("SVF_Sebastian Vettel_MCLAREN\n")
+    assert not check_input_files([str(path)])[1]
+
+
+def test_add_drivers_to_db_whole_second_lap(test_db, tmp_path):
+    (tmp_path / "abbreviations.txt").write_text("SVF_Sebastian Vettel_FERRARI\n")
+    (tmp_path / "start.log").write_text("SVF2018-05-24_12:02:58.000\n")
+    (tmp_path / "end.log").write_text("SVF2018-05-24_12:04:03.000\n")
+    report = parse_race(*(str(tmp_path / name) for name in ("abbreviations.txt", "start.log", "end.log")))
+
+    add_drivers_to_db(report)
+    assert DriverModel.get(DriverModel.abbr == "SVF").best_lap_ms == 65000
+
+
+def test_bulk_upsert_postgres(postgres_db):
+    assert add_drivers_to_db(param_for_report)["inserted"] == 3
+    report = {"Kimi Raikkonen": dict(param_for_report["Kimi Raikkonen"], place=1, best_lap="0:01:03.100"),
+              "Sebastian Vettel": dict(param_for_report["Sebastian Vettel"], place=2)}
+
+    summary = add_drivers_to_db(report)
+
+    assert summary == {"inserted": 0, "updated": 2, "skipped": 0, "deleted": 1}
+    assert [(driver.abbr, driver.best_lap_ms) for driver in DriverModel.select().order_by(DriverModel.place)] == [
+        ("KRF", 63100), ("SVF", 64415)]
+
+    add_race_to_db(param_for_report, race_name="Monaco Grand Prix", season=2018)
+    summary = add_race_to_db(report, race_name="Monaco Grand Prix", season=2018)
+
+    assert summary == {"inserted": 0, "updated": 2, "skipped": 0, "deleted": 1}
+    assert [result.abbr for result in ResultModel.select().order_by(ResultModel.place)] == ["KRF", "SVF"]
@@ -0,0 +1,86 @@
+import json
+import queue
+
+import pytest
+from flask import url_for
+
+from app import app
+from db_utils import add_drivers_to_db, update_standings
+from events import Broadcaster, standings_events
+from .param_data import param_for_report, param_for_abbr_decoder
+
+
+app.config["SERVER_NAME"] = "localhost"
+
+
+def test_broadcaster_fan_out():
+    broadcaster = Broadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    broadcaster.publish([{"place": 1}])
+    broadcaster.publish([])
+
+    assert first.get(timeout=0) == second.get(timeout=0) == [{"place": 1}]
+    with pytest.raises(queue.Empty):
+        first.get(timeout=0)
+    broadcaster.unsubscribe(first)
+    assert len(broadcaster) == 1
+
+
+def test_broadcaster_slow_subscriber_overflows():
+    broadcaster = Broadcaster(queue_size=1)
+    subscription = broadcaster.subscribe()
+
+    broadcaster.publish([{"place": 1}])
+    broadcaster.publish([{"place": 2}])
+
+    assert subscription.overflowed
+
+
+def test_ingest_publishes_changed_rows(test_db):
+    subscription = standings_events.subscribe()
+    try:
+        add_drivers_to_db(param_for_report)
+        add_drivers_to_db(param_for_report)
+        update_standings([(1, "KRF", 63000)], param_for_abbr_decoder)
+
+        first_delta = subscription.get(timeout=0)
+        second_delta = subscription.get(timeout=0)
+    finally:
+        standings_events.unsubscribe(subscription)
+
+    assert [row["abbr"] for row in first_delta] == ["SVF", "KRF", "VBM"]
+    assert second_delta == [{"place": 1, "abbr": "KRF", "name": "Kimi Raikkonen",
+                             "team": "FERRARI", "best_lap": "0:01:03.000"}]
+
+
+def test_ingest_publishes_deleted_places(test_db):
+    add_drivers_to_db(param_for_report)
+    subscription = standings_events.subscribe()
+    try:
+        add_drivers_to_db(dict(list(param_for_report.items())[:2]))
+        update_standings([(1, "KRF", 63000)], param_for_abbr_decoder, total_places=1)
+
+        first_delta = subscription.get(timeout=0)
+        second_delta = subscription.get(timeout=0)
+    finally:
+        standings_events.unsubscribe(subscription)
+
+    assert first_delta == [{"place": 3, "deleted": True}]
+    assert second_delta[-1] == {"place": 2, "deleted": True}
+
+
+def test_report_stream_api(client):
+    response = client.get(url_for("report_stream_api"))
+    chunks = iter(response.response)
+
+    assert response.mimetype == "text/event-stream"
+    assert next(chunks) == b": connected\n\n"
+
+    standings_events.publish([{"place": 1, "abbr": "SVF"}])
+    event = next(chunks).decode()
+    response.close()
+
+    assert event.startswith("event: standings\ndata: ")
+    assert json.loads(event.split("data: ", 1)[1]) == [{"place": 1, "abbr": "SVF"}]
+    assert len(standings_events) == 0
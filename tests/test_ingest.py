@@ -0,0 +1,39 @@
+import shutil
+
+from ingest import discover_races, ingest_season
+from models import RaceModel, ResultModel
+
+
+def make_season(tmp_path):
+    for race_name in ("Monaco", "Monza"):
+        race_dir = tmp_path / race_name
+        race_dir.mkdir()
+        for name in ("abbreviations.txt", "start.log", "end.log"):
+            shutil.copy(f"data/{name}", race_dir / name)
+    (tmp_path / "incomplete").mkdir()
+    (tmp_path / "incomplete" / "start.log").write_text("")
+    broken_dir = tmp_path / "broken"
+    broken_dir.mkdir()
+    for name in ("abbreviations.txt", "start.log"):
+        shutil.copy(f"data/{name}", broken_dir / name)
+    (broken_dir / "end.log").write_text("SVF2018-05-24_12:04:03.332\n")
+    return tmp_path
+
+
+def test_discover_races(tmp_path):
+    season_dir = make_season(tmp_path)
+
+    assert [race_name for race_name, _ in discover_races(season_dir)] == ["Monaco", "Monza", "broken"]
+
+
+def test_ingest_season(test_db, tmp_path):
+    season_dir = make_season(tmp_path)
+    messages = []
+
+    results = ingest_season(season_dir, season=2018, workers=2, progress=messages.append)
+
+    assert results["Monaco"]["inserted"] == results["Monza"]["inserted"] == 16
+    assert "error" in results["broken"]
+    assert len(messages) == 3
+    assert [race.name for race in RaceModel.select().order_by(RaceModel.name)] == ["Monaco", "Monza"]
+    assert ResultModel.select().count() == 32
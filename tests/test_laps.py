@@ -0,0 +1,58 @@
+from race_report import (LapStats, LapTracker, compute_lap_stats, best_laps_from_stats,
+                         drivers_best_lap)
+
+
+def write_log(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(data)
+    return str(path)
+
+
+def test_lap_stats_running_values():
+    stats = LapStats()
+
+    assert stats.add(70000) is True
+    assert stats.add(65000) is True
+    assert stats.add(90000) is False
+    assert stats.serialize() == {"count": 3, "best_ms": 65000, "mean_ms": 75000.0}
+
+
+def test_lap_tracker_pairs_events_in_any_order():
+    tracker = LapTracker()
+
+    assert tracker.add_end("SVF", 1500) is None
+    assert tracker.add_start("SVF", 1000) == 500
+    assert tracker.add_start("SVF", 2000) is None
+    assert tracker.add_end("SVF", 2300) == 300
+    assert tracker.stats["SVF"].count == 2
+    assert tracker.stats["SVF"].best_ms == 300
+    assert tracker.unmatched() == {}
+
+
+def test_lap_tracker_skips_negative_laps():
+    tracker = LapTracker()
+    tracker.add_start("SVF", 2000)
+
+    assert tracker.add_end("SVF", 1000) is None
+    assert "SVF" not in tracker.stats
+
+
+def test_compute_lap_stats_many_laps(tmp_path):
+    start = write_log(tmp_path, "start.log",
+                      "SVF2018-05-24_12:00:00.000\nKRF2018-05-24_12:00:01.000\n"
+                      "SVF2018-05-24_12:01:10.000\nKRF2018-05-24_12:01:15.000\n")
+    end = write_log(tmp_path, "end.log",
+                    "SVF2018-05-24_12:01:10.000\nKRF2018-05-24_12:01:15.000\n"
+                    "SVF2018-05-24_12:02:15.500\nKRF2018-05-24_12:02:30.000\n")
+
+    result = compute_lap_stats(start, end, chunk_size=7)
+
+    assert result["SVF"].serialize() == {"count": 2, "best_ms": 65500, "mean_ms": 67750.0}
+    assert result["KRF"].serialize() == {"count": 2, "best_ms": 74000, "mean_ms": 74500.0}
+    assert best_laps_from_stats(result) == {"SVF": "0:01:05.500", "KRF": "0:01:14.000"}
+
+
+def test_compute_lap_stats_matches_drivers_best_lap_for_single_lap():
+    result = best_laps_from_stats(compute_lap_stats("data/start.log", "data/end.log"))
+
+    assert result == drivers_best_lap("data/start.log", "data/end.log")
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from db_utils import add_drivers_to_db
+from live import LogTail, LiveIngestor
+from models import DriverModel
+from .param_data import param_for_report
+
+
+ABBREVIATIONS = "SVF_Sebastian Vettel_FERRARI\nKRF_Kimi Raikkonen_FERRARI\n"
+
+
+def append(path, data):
+    with open(path, "a") as file:
+        file.write(data)
+
+
+def test_log_tail_reads_only_complete_new_lines(tmp_path):
+    path = tmp_path / "start.log"
+    path.write_text("SVF2018-05-24_12:00:00.000\nKRF2018-05-24_12:00")
+    tail = LogTail(str(path))
+
+    assert [abbr for abbr, _ in tail.read_new_records()] == ["SVF"]
+    assert tail.read_new_records() == []
+
+    append(path, ":01.000\n")
+    assert [abbr for abbr, _ in tail.read_new_records()] == ["KRF"]
+
+
+def test_log_tail_truncated_file(tmp_path):
+    path = tmp_path / "start.log"
+    path.write_text("SVF2018-05-24_12:00:00.000\nKRF2018-05-24_12:00:01.000\n")
+    tail = LogTail(str(path))
+    tail.read_new_records()
+
+    path.write_text("SVF2018-05-24_12:10:00.000\n")
+
+    assert [abbr for abbr, _ in tail.read_new_records()] == ["SVF"]
+
+
+def test_log_tail_skips_malformed_lines(tmp_path):
+    path = tmp_path / "start.log"
+    path.write_text("SVF2018-05-24_12:00:00.000\nBAD\nKRF2018-05-24_12:00:01.000\n")
+    tail = LogTail(str(path))
+
+    assert [abbr for abbr, _ in tail.read_new_records()] == ["SVF", "KRF"]
+    assert tail.read_new_records() == []
+
+
+def test_live_ingestor_updates_standings(test_db, tmp_path):
+    abbreviations = tmp_path / "abbreviations.txt"
+    abbreviations.write_text(ABBREVIATIONS)
+    start, end = tmp_path / "start.log", tmp_path / "end.log"
+    start.write_text("SVF2018-05-24_12:00:00.000\nKRF2018-05-24_12:00:00.000\n")
+    end.write_text("SVF2018-05-24_12:01:10.000\nKRF2018-05-24_12:01:05.000\n")
+    ingestor = LiveIngestor(str(abbreviations), str(start), str(end))
+
+    assert ingestor.poll() == {"SVF", "KRF"}
+    assert [driver.abbr for driver in DriverModel.select().order_by(DriverModel.place)] == ["KRF", "SVF"]
+
+    append(start, "SVF2018-05-24_12:01:10.000\n")
+    assert ingestor.poll() == set()
+    append(end, "SVF2018-05-24_12:02:12.500\n")
+    assert ingestor.poll() == {"SVF"}
+
+    drivers = DriverModel.select().order_by(DriverModel.place)
+    assert [(driver.abbr, driver.best_lap) for driver in drivers] == [("SVF", "0:01:02.500"),
+                                                                      ("KRF", "0:01:05.000")]
+
+
+def test_live_ingestor_deletes_places_of_earlier_import(test_db, tmp_path):
+    add_drivers_to_db(param_for_report)
+    abbreviations = tmp_path / "abbreviations.txt"
+    abbreviations.write_text(ABBREVIATIONS)
+    start, end = tmp_path / "start.log", tmp_path / "end.log"
+    start.write_text("SVF2018-05-24_12:00:00.000\nKRF2018-05-24_12:00:00.000\n")
+    end.write_text("SVF2018-05-24_12:01:10.000\nKRF2018-05-24_12:01:05.000\n")
+
+    LiveIngestor(str(abbreviations), str(start), str(end)).poll()
+
+    assert [driver.abbr for driver in DriverModel.select().order_by(DriverModel.place)] == ["KRF", "SVF"]
+
+
+def test_live_ingestor_rewrites_only_changed_places(test_db, tmp_path):
+    abbreviations = tmp_path / "abbreviations.txt"
+    abbreviations.write_text(ABBREVIATIONS + "VBM_Valtteri Bottas_MERCEDES\n")
+    start, end = tmp_path / "start.log", tmp_path / "end.log"
+    start.write_text("SVF2018-05-24_12:00:00.000\nKRF2018-05-24_12:00:00.000\nVBM2018-05-24_12:00:00.000\n")
+    end.write_text("SVF2018-05-24_12:01:10.000\nKRF2018-05-24_12:01:05.000\nVBM2018-05-24_12:01:20.000\n")
+    ingestor = LiveIngestor(str(abbreviations), str(start), str(end))
+    ingestor.poll()
+
+    append(start, "SVF2018-05-24_12:01:10.000\n")
+    append(end, "SVF2018-05-24_12:02:12.500\n")
+    with patch("live.update_standings") as mock:
+        ingestor.poll()
+
+    entries = mock.call_args.args[0]
+    assert entries == [(1, "SVF", 62500), (2, "KRF", 65000)]
@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import sys
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+
+import pytest
+
+from logger.logger import JsonFormatter, create_file_handler, create_queue_handler, log_synchronously_after_fork
+
+
+def make_record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("report", level, "db_utils.py", 42, message, None, None)
+
+
+def test_json_formatter():
+    entry = json.loads(JsonFormatter().format(make_record("Drivers loaded to DB")))
+
+    assert entry["level"] == "INFO"
+    assert entry["file"] == "db_utils.py"
+    assert entry["line"] == 42
+    assert entry["message"] == "Drivers loaded to DB"
+
+
+def test_create_file_handler_rotation(tmp_path):
+    path = str(tmp_path / "report.log")
+
+    assert isinstance(create_file_handler(path, "size"), RotatingFileHandler)
+    assert isinstance(create_file_handler(path, "time"), TimedRotatingFileHandler)
+    assert type(create_file_handler(path, "none")) is logging.FileHandler
+
+
+def test_queue_handler_writes_in_background(tmp_path):
+    path = tmp_path / "report.log"
+    file_handler = create_file_handler(str(path), "size", "json")
+    queue_handler, listener = create_queue_handler(file_handler)
+
+    queue_handler.handle(make_record("first"))
+    queue_handler.handle(make_record("second", logging.ERROR))
+    listener.stop()
+    file_handler.close()
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [entry["message"] for entry in entries] == ["first", "second"]
+    assert entries[1]["level"] == "ERROR"
+
+
+def test_queue_handler_formats_exception(tmp_path):
+    path = tmp_path / "report.log"
+    file_handler = create_file_handler(str(path), "none", "json")
+    queue_handler, listener = create_queue_handler(file_handler)
+
+    try:
+        raise ValueError("Invalid lap")
+    except ValueError:
+        record = make_record("Live ingestion failed", logging.ERROR)
+        record.exc_info = sys.exc_info()
+    queue_handler.handle(record)
+    listener.stop()
+    file_handler.close()
+
+    entry = json.loads(path.read_text())
+    assert "ValueError: Invalid lap" in entry["exception"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_queue_handler_forked_child_writes_synchronously(tmp_path):
+    path = tmp_path / "report.log"
+    file_handler = create_file_handler(str(path), "none", "text")
+    queue_handler, listener = create_queue_handler(file_handler)
+    logger = logging.getLogger("tests.forked")
+    logger.addHandler(queue_handler)
+    log_synchronously_after_fork(logger, queue_handler, file_handler)
+
+    pid = os.fork()
+    if pid == 0:
+        logger.error("Invalid time for SSW")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    listener.stop()
+    logger.removeHandler(queue_handler)
+    file_handler.close()
+
+    assert "Invalid time for SSW" in path.read_text()
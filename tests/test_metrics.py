@@ -0,0 +1,78 @@
+import logging
+import pstats
+from unittest.mock import patch
+
+from flask import url_for
+
+from app import app
+from metrics import (Histogram, request_latency, request_queries, stage_latency, timed_stage, count_queries,
+                     start_request_queries, request_query_count)
+from models import create_database_from_url
+from race_report import build_report
+from .param_data import param_for_abbr_decoder, param_for_drivers_best_lap
+
+
+app.config["SERVER_NAME"] = "localhost"
+
+
+def test_histogram_render():
+    histogram = Histogram("test_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/report/")
+    histogram.observe(0.5, "/report/")
+    histogram.observe(5, "/report/")
+
+    assert histogram.render() == ["# HELP test_seconds Test latency.",
+                                  "# TYPE test_seconds histogram",
+                                  'test_seconds_bucket{route="/report/",le="0.1"} 1',
+                                  'test_seconds_bucket{route="/report/",le="1"} 2',
+                                  'test_seconds_bucket{route="/report/",le="+Inf"} 3',
+                                  'test_seconds_sum{route="/report/"} 5.55',
+                                  'test_seconds_count{route="/report/"} 3']
+
+
+def test_timed_stage():
+    count = stage_latency.count("build_report")
+
+    build_report(param_for_abbr_decoder, param_for_drivers_best_lap)
+
+    assert stage_latency.count("build_report") == count + 1
+    assert timed_stage("test")(lambda value: value * 2)(21) == 42
+
+
+def test_request_metrics(client):
+    latency_count = request_latency.count("GET", "/api/v1/races/", 200)
+    queries_count = request_queries.count("GET", "/api/v1/races/")
+
+    client.get(url_for("races_api", format="json"))
+    response = client.get(url_for("metrics"))
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert request_latency.count("GET", "/api/v1/races/", 200) == latency_count + 1
+    assert request_queries.count("GET", "/api/v1/races/") == queries_count + 1
+    assert 'report_http_request_duration_seconds_count{method="GET",route="/api/v1/races/",status="200"}' \
+        in response.text
+    assert "report_db_queries_total" in response.text
+
+
+def test_count_queries():
+    database = create_database_from_url("sqlite:///:memory:")
+    peewee_level = logging.getLogger("peewee").level
+    count_queries(database)
+    count_queries(database)
+
+    start_request_queries()
+    database.execute_sql("SELECT 1")
+    database.execute_sql("SELECT 2")
+
+    assert request_query_count() == 2
+    assert logging.getLogger("peewee").level == peewee_level
+
+
+def test_profile_sampling(client, tmp_path):
+    with patch("metrics.PROFILE_SAMPLE_RATE", 1.0), patch("metrics.PROFILE_DIR", str(tmp_path)):
+        client.get(url_for("report_api", format="json"))
+
+    profiles = list(tmp_path.glob("*-report_api.prof"))
+    assert len(profiles) == 1
+    assert pstats.Stats(str(profiles[0])).total_calls > 0
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+
+from race_report import (drivers_best_lap, drivers_best_lap_ms, read_race_data_ms, read_race_data,
+                         iter_race_records, parse_timestamp_ms, format_lap_ms, parse_lap_ms)
+
+
+def write_log(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data.encode())
+    return str(path)
+
+
+def test_parse_timestamp_ms_matches_strptime():
+    record = b"SVF2018-05-24_12:02:58.917"
+    expected = datetime.strptime("2018-05-24_12:02:58.917", "%Y-%m-%d_%H:%M:%S.%f") - datetime(1970, 1, 1)
+
+    assert parse_timestamp_ms(record) == expected // datetime.resolution // 1000
+
+
+def test_parse_timestamp_ms_invalid_data():
+    with pytest.raises(ValueError):
+        parse_timestamp_ms(b"SVF2018-05-24_12:02:58.91")
+    with pytest.raises(ValueError):
+        parse_timestamp_ms(b"SVF2018-05-24_12:0x:58.917")
+
+
+def test_format_and_parse_lap_ms():
+    assert format_lap_ms(64415) == "0:01:04.415"
+    assert format_lap_ms(3_600_000) == "1:00:00.000"
+    assert parse_lap_ms("0:01:04.415") == 64415
+    assert parse_lap_ms(format_lap_ms(754321)) == 754321
+
+
+def test_iter_race_records_small_chunks(tmp_path):
+    path = write_log(tmp_path, "start.log",
+                     "SVF2018-05-24_12:02:58.917 \n\nNHR2018-05-24_12:02:49.914")
+
+    result = list(iter_race_records(path, chunk_size=5))
+
+    assert [abbr for abbr, _ in result] == ["SVF", "NHR"]
+    assert result[0][1] - result[1][1] == 9003
+
+
+def test_read_race_data_ms_last_record_wins(tmp_path):
+    path = write_log(tmp_path, "start.log",
+                     "SVF2018-05-24_12:02:58.917\nSVF2018-05-24_12:03:58.917\n")
+
+    result = read_race_data_ms(path)
+
+    assert result == {"SVF": parse_timestamp_ms(b"SVF2018-05-24_12:03:58.917")}
+
+
+def test_read_race_data_ms_strips_lines(tmp_path):
+    path = write_log(tmp_path, "start.log",
+                     "  SVF2018-05-24_12:02:58.917\nKRF2018-05-24_12:02:00.000\n\tSVF2018-05-24_12:03:58.917 \n")
+
+    result = read_race_data_ms(path)
+
+    assert result == {"SVF": parse_timestamp_ms(b"SVF2018-05-24_12:03:58.917"),
+                      "KRF": parse_timestamp_ms(b"KRF2018-05-24_12:02:00.000")}
+    assert list(result) == list(read_race_data(path))
+
+
+def test_read_race_data_ms_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        read_race_data_ms("path_to_file")
+
+
+def test_drivers_best_lap_ms_matches_drivers_best_lap():
+    expected = drivers_best_lap("data/start.log", "data/end.log")
+
+    result = drivers_best_lap_ms("data/start.log", "data/end.log")
+
+    assert {abbr: format_lap_ms(lap) for abbr, lap in result.items()} == expected
+    assert list(result) == list(expected)
+
+
+def test_drivers_best_lap_ms_invalid_data(tmp_path):
+    start = write_log(tmp_path, "start.log", "SVF2018-05-24_12:02:58.917\nHNV2018-05-24_12:02:49.914")
+    end = write_log(tmp_path, "end.log", "SVF2018-05-24_12:04:03.332\nNNV2018-05-24_12:04:02.979")
+
+    with pytest.raises(ValueError):
+        drivers_best_lap_ms(start, end)
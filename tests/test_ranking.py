@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from race_report import IndexableSkipList, Leaderboard
+
+
+def test_indexable_skip_list_matches_sorted_list():
+    rng = random.Random(1)
+    skip_list = IndexableSkipList(seed=1)
+    expected = []
+    for _ in range(2000):
+        if expected and rng.random() < 0.3:
+            key = rng.choice(expected)
+            skip_list.remove(key)
+            expected.remove(key)
+        else:
+            key = (rng.randrange(1000), rng.random())
+            skip_list.insert(key)
+            expected.append(key)
+    expected.sort()
+
+    assert len(skip_list) == len(expected)
+    assert list(skip_list) == expected
+    assert [skip_list[index] for index in range(0, len(expected), 37)] == expected[::37]
+    for index in range(0, len(expected), 53):
+        assert skip_list.index(expected[index]) == index
+    assert list(skip_list.islice(10, 15)) == expected[10:15]
+
+
+def test_indexable_skip_list_missing_key():
+    skip_list = IndexableSkipList()
+    skip_list.insert(1)
+
+    with pytest.raises(KeyError):
+        skip_list.remove(2)
+    with pytest.raises(KeyError):
+        skip_list.index(0)
+    with pytest.raises(IndexError):
+        skip_list[1]
+
+
+def test_leaderboard_update_and_places():
+    leaderboard = Leaderboard(seed=1)
+
+    assert leaderboard.update("SVF", 70000) == (1, 1)
+    assert leaderboard.update("KRF", 72000) == (2, 2)
+    assert leaderboard.update("VBM", 65000) == (1, 3)
+    assert leaderboard.update("VBM", 65000) is None
+    assert leaderboard.update("KRF", 64000) == (1, 3)
+
+    assert leaderboard.place("KRF") == 1
+    assert leaderboard.place("SVF") == 3
+    assert leaderboard.top(2) == [(1, "KRF", 64000), (2, "VBM", 65000)]
+    assert leaderboard.entries(2, 3) == [(2, "VBM", 65000), (3, "SVF", 70000)]
+    assert len(leaderboard) == 3
+
+
+def test_leaderboard_worse_lap_moves_down():
+    leaderboard = Leaderboard()
+    for place, driver_abbr in enumerate(["AAA", "BBB", "CCC", "DDD"], 1):
+        leaderboard.update(driver_abbr, place * 1000)
+
+    assert leaderboard.update("AAA", 3500) == (1, 3)
+    assert [driver_abbr for _, driver_abbr, _ in leaderboard.top(4)] == ["BBB", "CCC", "AAA", "DDD"]
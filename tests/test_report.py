@@ -75,6 +75,17 @@ def test_drivers_best_lap_valid_data():
         assert result == expected_data
 
 
+def test_drivers_best_lap_whole_seconds():
+    time_start = "SVF2018-05-24_12:02:58.000"
+    time_finish = "SVF2018-05-24_12:04:03.000"
+    mock_file_start = mock_open(read_data=time_start)
+    mock_file_finish = mock_open(read_data=time_finish)
+    with patch("builtins.open") as mock_open_func:
+        mock_open_func.side_effect = [mock_file_start.return_value, mock_file_finish.return_value]
+        result = drivers_best_lap("path_to_start_file", "path_to_end_file")
+        assert result == {"SVF": "0:01:05.000"}
+
+
 def test_drivers_best_lap_invalid_data():
     time_start = "SVF2018-05-24_12:02:58.917\nHNV2018-05-24_12:02:49.914"
     time_finish = "SVF2018-05-24_12:04:03.332\nNNV2018-05-24_12:04:02.979"
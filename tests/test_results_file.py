@@ -0,0 +1,42 @@
+import pytest
+
+from race_report import RaceResults, write_results, read_results, parse_race
+from .param_data import param_for_report
+
+
+def test_write_read_results(tmp_path):
+    path = tmp_path / "race.mrr"
+    write_results(param_for_report, str(path))
+    assert read_results(str(path)) == param_for_report
+
+
+def test_results_round_trip_parsed_race(tmp_path):
+    report = parse_race("data/abbreviations.txt", "data/start.log", "data/end.log")
+    path = tmp_path / "race.mrr"
+    write_results(report, str(path))
+
+    with RaceResults(str(path)) as results:
+        assert len(results) == len(report)
+        assert results.to_report() == report
+        first_name, first_driver = next(iter(report.items()))
+        assert results[0] == dict(first_driver, name=first_name)
+
+
+def test_results_interns_teams(tmp_path):
+    path = tmp_path / "race.mrr"
+    write_results(param_for_report, str(path))
+    with RaceResults(str(path)) as results:
+        team_ids = [results.record(index)[2] for index in range(len(results))]
+        assert team_ids == [0, 0, 1]
+        assert results.team(0) == "FERRARI"
+        with pytest.raises(IndexError):
+            results.record(3)
+
+
+def test_results_invalid_file(tmp_path):
+    path = tmp_path / "race.mrr"
+    path.write_bytes(b"not a results file")
+    with pytest.raises(ValueError):
+        RaceResults(str(path))
+    with pytest.raises(FileNotFoundError):
+        RaceResults(str(tmp_path / "missing.mrr"))
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from flask import url_for
+
+from app import app
+from cache import bump_generation, current_generation, version_tracker
+from db_utils import add_drivers_to_db, update_standings
+from models import DataVersionModel, DriverModel
+from snapshot import ReportSnapshot, report_snapshot, query_snapshot
+from .param_data import param_for_report, param_for_abbr_decoder
+
+
+app.config["SERVER_NAME"] = "localhost"
+
+DRIVERS = [{"name": name, **driver} for name, driver in param_for_report.items()]
+
+
+def test_snapshot_views():
+    snapshot = ReportSnapshot(DRIVERS, generation=7)
+
+    assert snapshot.generation == 7
+    assert len(snapshot) == 3
+    assert [driver["place"] for driver in snapshot.by_place] == [1, 2, 3]
+    assert [driver["place"] for driver in snapshot.by_place_desc] == [3, 2, 1]
+    assert [driver["abbr"] for driver in snapshot.by_name] == ["KRF", "SVF", "VBM"]
+    assert [driver["abbr"] for driver in snapshot.by_name_desc] == ["VBM", "SVF", "KRF"]
+    assert snapshot.by_abbr["VBM"]["name"] == "Valtteri Bottas"
+
+
+def test_query_snapshot():
+    rows = ReportSnapshot(DRIVERS).by_place
+
+    assert query_snapshot(rows, ("abbr",), team="FERRARI") == [{"abbr": "SVF"}, {"abbr": "KRF"}]
+    assert query_snapshot(rows, ("place",), after_place=1, limit=1) == [{"place": 2}]
+    assert query_snapshot(rows, ("place",), offset=2) == [{"place": 3}]
+
+
+def test_snapshot_swapped_on_ingest(test_db):
+    add_drivers_to_db(param_for_report)
+    snapshot = report_snapshot.get()
+
+    assert snapshot.generation == current_generation()
+    assert snapshot.by_abbr["SVF"]["best_lap"] == "0:01:04.415"
+
+    update_standings([(1, "VBM", 60000), (3, "SVF", 64415)], param_for_abbr_decoder)
+    new_snapshot = report_snapshot.get()
+
+    assert new_snapshot is not snapshot
+    assert new_snapshot.by_place[0]["abbr"] == "VBM"
+    assert snapshot.by_place[0]["abbr"] == "SVF"
+
+
+def test_snapshot_rebuilt_on_generation_change(test_db):
+    add_drivers_to_db(param_for_report)
+    snapshot = report_snapshot.get()
+    assert report_snapshot.get() is snapshot
+
+    bump_generation()
+
+    assert report_snapshot.get() is not snapshot
+
+
+def test_snapshot_rebuilt_on_write_from_another_process(test_db):
+    add_drivers_to_db(param_for_report)
+    snapshot = report_snapshot.get()
+
+    DriverModel.update(team="MCLAREN").where(DriverModel.abbr == "SVF").execute()
+    DataVersionModel.update(version=DataVersionModel.version + 1).execute()
+    with patch.object(version_tracker, "ttl", 0):
+        new_snapshot = report_snapshot.get()
+
+    assert snapshot.by_abbr["SVF"]["team"] == "FERRARI"
+    assert new_snapshot.by_abbr["SVF"]["team"] == "MCLAREN"
+
+
+def test_report_served_from_snapshot(client):
+    report_snapshot.get()
+    with patch("app.DriverModel.select") as mock:
+        response = client.get(url_for("report", order="desc"))
+        api_response = client.get(url_for("report_drivers_api", format="json"))
+
+        mock.assert_not_called()
+    assert response.status_code == 200
+    assert api_response.status_code == 200
@@ -0,0 +1,71 @@
+import pytest
+
+from race_report import (drivers_best_lap, drivers_best_lap_vectorized, parse_records,
+                         parse_timestamp_ms, read_race_arrays)
+
+
+np = pytest.importorskip("numpy")
+
+
+def write_log(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(data)
+    return str(path)
+
+
+def test_parse_records_matches_scalar_parser():
+    data = b"SVF2018-05-24_12:02:58.917\n\nNHR1999-12-31_23:59:59.999 \n"
+
+    abbrs, timestamps = parse_records(data)
+
+    assert abbrs.tolist() == [b"SVF", b"NHR"]
+    assert timestamps.dtype == np.int64
+    assert timestamps.tolist() == [parse_timestamp_ms(b"SVF2018-05-24_12:02:58.917"),
+                                   parse_timestamp_ms(b"NHR1999-12-31_23:59:59.999")]
+
+
+def test_parse_records_invalid_data():
+    with pytest.raises(ValueError):
+        parse_records(b"SVF2018-05-24_12:0x:58.917")
+    with pytest.raises(ValueError):
+        parse_records(b"SVF2018-05-24_12:02:58,917")
+
+
+def test_read_race_arrays_last_record_wins(tmp_path):
+    path = write_log(tmp_path, "start.log", "SVF2018-05-24_12:02:58.917\nKRF2018-05-24_12:02:00.000\n"
+                                            "SVF2018-05-24_12:03:58.917\n")
+
+    abbrs, timestamps = read_race_arrays(path, chunk_size=30)
+
+    assert abbrs.tolist() == [b"KRF", b"SVF"]
+    assert timestamps[1] == parse_timestamp_ms(b"SVF2018-05-24_12:03:58.917")
+    assert read_race_arrays(path, chunk_size=30, with_first_seen=True)[2].tolist() == [1, 0]
+
+
+def test_drivers_best_lap_vectorized_matches_drivers_best_lap():
+    expected = drivers_best_lap("data/start.log", "data/end.log")
+
+    result = drivers_best_lap_vectorized("data/start.log", "data/end.log")
+
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+def test_drivers_best_lap_vectorized_equal_laps_keep_log_order(tmp_path):
+    start = write_log(tmp_path, "start.log", "ZZZ2018-05-24_12:00:00.000\nKRF2018-05-24_12:00:00.000\n"
+                                             "AAA2018-05-24_12:00:00.000\nZZZ2018-05-24_12:00:00.000\n")
+    end = write_log(tmp_path, "end.log", "AAA2018-05-24_12:01:05.000\nZZZ2018-05-24_12:01:05.000\n"
+                                         "KRF2018-05-24_12:01:10.000\n")
+
+    result = drivers_best_lap_vectorized(start, end)
+
+    assert list(result.items()) == list(drivers_best_lap(start, end).items())
+    assert list(result) == ["ZZZ", "AAA", "KRF"]
+
+
+def test_drivers_best_lap_vectorized_invalid_data(tmp_path):
+    start = write_log(tmp_path, "start.log", "SVF2018-05-24_12:02:58.917\nHNV2018-05-24_12:02:49.914")
+    end = write_log(tmp_path, "end.log", "SVF2018-05-24_12:04:03.332\nNNV2018-05-24_12:04:02.979")
+
+    with pytest.raises(ValueError):
+        drivers_best_lap_vectorized(start, end)
@@ -0,0 +1,41 @@
+import xml.etree.ElementTree as ET
+
+from dict2xml import dict2xml
+
+from xml_writer import driver_to_xml, to_xml
+
+
+drivers = [{"name": "Sebastian Vettel", "place": 1, "team": "FERRARI", "best_lap": "0:01:04.415", "abbr": "SVF"},
+           {"name": "Kimi <Räikkönen> & Co", "place": 2, "team": "FERRARI", "best_lap": "0:01:12.657", "abbr": "KRF"}]
+
+
+def elements(root):
+    """Child tags and texts, sorted as dict2xml sorts keys while xml_writer keeps their order."""
+    return sorted((element.tag, element.text) for element in root)
+
+
+def test_driver_to_xml_matches_dict2xml():
+    for driver in drivers:
+        expected = ET.fromstring(f"<driver>{dict2xml(driver)}</driver>")
+
+        assert elements(ET.fromstring(driver_to_xml(driver))) == elements(expected)
+
+
+def test_to_xml_list_matches_dict2xml():
+    expected = ET.fromstring(f"<root>{dict2xml(drivers)}</root>")
+
+    root = ET.fromstring(to_xml(drivers))
+
+    assert root.tag == "drivers"
+    assert [element.tag for element in root] == ["driver", "driver"]
+    assert sorted(item for driver in root for item in elements(driver)) == elements(expected)
+
+
+def test_to_xml_escaping_and_empty_values():
+    result = to_xml({"name": "A & B <C>", "team": None})
+
+    assert result == "<driver><name>A &amp; B &lt;C&gt;</name><team></team></driver>"
+
+
+def test_to_xml_empty_list():
+    assert to_xml([]) == "<drivers></drivers>"
@@ -0,0 +1,38 @@
+from xml.sax.saxutils import escape
+
+
+ROOT_TAG = "drivers"
+ITEM_TAG = "driver"
+FIELDS = ("name", "place", "team", "best_lap", "abbr", "id", "season", "session")
+FIELD_TAGS = {field: (f"<{field}>", f"</{field}>") for field in FIELDS}
+
+
+def driver_to_xml(driver: dict, tag: str = ITEM_TAG) -> str:
+    """Serialize one flat driver or race dict into an element.
+
+    Only the known fields are accepted, so tag names never need escaping.
+    """
+    parts = [f"<{tag}>"]
+    for field, value in driver.items():
+        open_tag, close_tag = FIELD_TAGS[field]
+        parts.append(open_tag)
+        if value is not None:
+            parts.append(escape(str(value)))
+        parts.append(close_tag)
+    parts.append(f"</{tag}>")
+    return "".join(parts)
+
+
+def iter_xml(drivers, root: str = ROOT_TAG, tag: str = ITEM_TAG):
+    """Yield an XML document for a list of drivers fragment by fragment."""
+    yield f"<{root}>"
+    for driver in drivers:
+        yield driver_to_xml(driver, tag)
+    yield f"</{root}>"
+
+
+def to_xml(data, root: str = ROOT_TAG, tag: str = ITEM_TAG) -> str:
+    """Serialize a driver dict, or a list of them wrapped in a `root` element."""
+    if isinstance(data, dict):
+        return driver_to_xml(data, tag)
+    return "".join(iter_xml(data, root, tag))